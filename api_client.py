@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+from http import HTTPStatus
+import time
+from typing import Optional
+
+import exceptions
+from lazy import lazy_import
+from resilience import CircuitBreaker
+
+requests = lazy_import('requests')
+
+# Заголовки ответа с валидаторами и заголовки условного запроса для них.
+VALIDATOR_HEADERS = (
+    ('ETag', 'If-None-Match'),
+    ('Last-Modified', 'If-Modified-Since'),
+)
+
+
+class PracticumClient:
+    """Клиент API Yandex Practicum.
+
+    При pool_size > 0 запросы идут через requests.Session с пулом
+    постоянных соединений, иначе каждый запрос выполняется через
+    requests.get с новым соединением.
+
+    Таймауты задаются раздельно на установку соединения и чтение
+    ответа; таймаут чтения дополнительно ограничивается дедлайном цикла.
+    Если дедлайн наступил до запроса или запрос не успел до него,
+    вызывается CycleDeadlineExceeded, и сбоем API это не считается.
+
+    Если передан breaker, сетевые ошибки и ответы 5xx/429 размыкают
+    цепь, и пока она разомкнута, запросы завершаются CircuitOpenError.
+
+    Если API вернул ETag или Last-Modified, повторный запрос с тем же
+    токеном и параметрами отправляется с If-None-Match и
+    If-Modified-Since, и при неизменных данных API отвечает 304 без тела.
+    С conditional=False запрос всегда безусловный, а валидаторы ответа
+    не запоминаются.
+    Сжатие ответа gzip requests запрашивает сам.
+    """
+
+    def __init__(self, endpoint: str, headers: dict, pool_size: int = 0,
+                 connect_timeout: float = 5.0, read_timeout: float = 30.0,
+                 breaker: Optional[CircuitBreaker] = None) -> None:
+        self.endpoint = endpoint
+        self.headers = headers
+        self.pool_size = pool_size
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.breaker = breaker
+        self._validators = {}
+        self.session = requests
+        if pool_size > 0:
+            self.session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(
+                pool_connections=1, pool_maxsize=pool_size, pool_block=True
+            )
+            self.session.mount('https://', adapter)
+            self.session.mount('http://', adapter)
+
+    def get(self, params: dict, headers: Optional[dict] = None,
+            deadline: Optional[float] = None,
+            conditional: bool = True) -> requests.Response:
+        """Выполняет GET-запрос к эндпоинту.
+
+        deadline задаётся по часам time.monotonic().
+        """
+        if deadline is not None and time.monotonic() >= deadline:
+            raise exceptions.CycleDeadlineExceeded(
+                f'Запрос к {self.endpoint} пропущен: бюджет цикла исчерпан'
+            )
+        if self.breaker is not None and not self.breaker.allow():
+            raise exceptions.CircuitOpenError(
+                f'Запросы к {self.endpoint} приостановлены после серии сбоев'
+            )
+        headers = headers or self.headers
+        key = headers.get('Authorization')
+        try:
+            response = self.session.get(
+                self.endpoint,
+                headers=(
+                    self._conditional(key, params, headers)
+                    if conditional else headers
+                ),
+                params=params,
+                timeout=self.timeout(deadline),
+            )
+        except requests.Timeout as error:
+            if deadline is None or time.monotonic() < deadline:
+                self._record(success=False)
+                raise
+            if self.breaker is not None:
+                self.breaker.cancel()
+            raise exceptions.CycleDeadlineExceeded(
+                f'Запрос к {self.endpoint} прерван: бюджет цикла исчерпан'
+            ) from error
+        except requests.RequestException:
+            self._record(success=False)
+            raise
+        self._record(success=not is_server_failure(response.status_code))
+        if conditional and response.status_code == HTTPStatus.OK:
+            self._remember(key, params, response)
+        return response
+
+    def _conditional(self, key: Optional[str], params: dict,
+                     headers: dict) -> dict:
+        validators = self._validators.get(key)
+        if validators is None or validators[0] != params:
+            return headers
+        return {**headers, **validators[1]}
+
+    def _remember(self, key: Optional[str], params: dict,
+                  response: requests.Response) -> None:
+        response_headers = getattr(response, 'headers', None) or {}
+        conditions = {
+            condition: response_headers[validator]
+            for validator, condition in VALIDATOR_HEADERS
+            if validator in response_headers
+        }
+        if conditions:
+            self._validators[key] = (dict(params), conditions)
+        else:
+            self._validators.pop(key, None)
+
+    def _record(self, success: bool) -> None:
+        if self.breaker is None:
+            return
+        if success:
+            self.breaker.record_success()
+        else:
+            self.breaker.record_failure()
+
+    def timeout(self, deadline: Optional[float] = None) -> tuple:
+        """Возвращает таймауты соединения и чтения с учётом дедлайна."""
+        read_timeout = self.read_timeout
+        if deadline is not None:
+            remaining = deadline - time.monotonic()
+            read_timeout = max(min(read_timeout, remaining), 0.001)
+        return self.connect_timeout, read_timeout
+
+    def close(self) -> None:
+        """Закрывает соединения пула."""
+        if self.session is not requests:
+            self.session.close()
+
+
+def is_server_failure(status_code: int) -> bool:
+    """Проверяет, говорит ли код ответа о сбое на стороне API."""
+    return (
+        status_code >= HTTPStatus.INTERNAL_SERVER_ERROR
+        or status_code == HTTPStatus.TOO_MANY_REQUESTS
+    )
@@ -0,0 +1,285 @@
+"""Бенчмарки цепочки опрос — разбор — уведомление.
+
+    python benchmarks/bench_pipeline.py            # сравнить с baseline.json
+    python benchmarks/bench_pipeline.py --save     # обновить baseline.json
+    python benchmarks/bench_pipeline.py --only parse_status
+
+Каждый бенчмарк возвращает пропускную способность (операций в секунду)
+по лучшему из нескольких прогонов. Сравнение завершается с кодом 1,
+если какой-либо бенчмарк медленнее сохранённого на --tolerance.
+"""
+import argparse
+import json
+import logging
+import os
+import subprocess
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [BASE_DIR, os.path.join(BASE_DIR, 'tests')]
+
+import homework  # noqa: E402
+from api_client import PracticumClient  # noqa: E402
+from fake_practicum import FakePracticumAPI  # noqa: E402
+from records import decode_json  # noqa: E402
+from subscribers import Subscriber, SubscriberState  # noqa: E402
+from utils import MockTelegramBot  # noqa: E402
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), 'baseline.json')
+STATUSES = tuple(homework.HOMEWORK_VERDICTS)
+BENCHMARKS = {}
+
+
+def benchmark(name):
+    """Регистрирует бенчмарк."""
+    def decorator(func):
+        BENCHMARKS[name] = func
+        return func
+    return decorator
+
+
+def best_rate(func, operations: int, rounds: int = 5) -> float:
+    """Возвращает лучшую пропускную способность из rounds прогонов."""
+    best = float('inf')
+    for _ in range(rounds):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return operations / best
+
+
+def make_response(size: int) -> dict:
+    """Создаёт ответ API с size работами."""
+    return {
+        'homeworks': [
+            {
+                'id': number,
+                'status': STATUSES[number % len(STATUSES)],
+                'homework_name': f'student__hw{number}.zip',
+                'reviewer_comment': 'Всё хорошо',
+                'date_updated': '2020-02-13T14:40:57Z',
+                'lesson_name': f'Урок {number}',
+            }
+            for number in range(size)
+        ],
+        'current_date': 1581604970,
+    }
+
+
+def use_client(api: FakePracticumAPI, pool_size: int) -> PracticumClient:
+    """Направляет бота на заглушку API."""
+    homework.api_client = PracticumClient(
+        api.url, homework.HEADERS, pool_size=pool_size
+    )
+    return homework.api_client
+
+
+@benchmark('get_api_answer')
+def bench_get_api_answer() -> float:
+    """Запросы к заглушке API без пула соединений."""
+    requests_qty = 200
+    with FakePracticumAPI() as api:
+        api.add_homework('token', 'hw')
+        client = use_client(api, pool_size=0)
+        subscriber = Subscriber('token', 'token')
+        rate = best_rate(
+            lambda: [
+                homework.get_subscriber_answer(subscriber, 0)
+                for _ in range(requests_qty)
+            ],
+            requests_qty, rounds=3
+        )
+        client.close()
+    return rate
+
+
+@benchmark('get_api_answer_pooled')
+def bench_get_api_answer_pooled() -> float:
+    """Запросы к заглушке API через пул постоянных соединений."""
+    requests_qty = 200
+    with FakePracticumAPI() as api:
+        api.add_homework('token', 'hw')
+        client = use_client(api, pool_size=4)
+        subscriber = Subscriber('token', 'token')
+        rate = best_rate(
+            lambda: [
+                homework.get_subscriber_answer(subscriber, 0)
+                for _ in range(requests_qty)
+            ],
+            requests_qty, rounds=3
+        )
+        client.close()
+    return rate
+
+
+class EncodedResponse:
+    """Ответ API с телом в байтах, как у requests.Response."""
+
+    def __init__(self, response: dict) -> None:
+        self.content = json.dumps(response, ensure_ascii=False).encode()
+
+    def json(self) -> dict:
+        """Декодирует тело стандартным модулем json."""
+        return json.loads(self.content)
+
+
+@benchmark('decode_response')
+def bench_decode_response() -> float:
+    """Декодирование ответа с 10 000 работ (orjson, если установлен)."""
+    response = EncodedResponse(make_response(10000))
+    return best_rate(lambda: decode_json(response), 10000)
+
+
+@benchmark('decode_response_stdlib')
+def bench_decode_response_stdlib() -> float:
+    """Декодирование ответа с 10 000 работ модулем json."""
+    response = EncodedResponse(make_response(10000))
+    return best_rate(response.json, 10000)
+
+
+@benchmark('check_response')
+def bench_check_response() -> float:
+    """Проверка ответа с 10 000 работ и перевод их в записи."""
+    response = make_response(10000)
+    return best_rate(
+        lambda: homework.check_response(response),
+        len(response['homeworks'])
+    )
+
+
+@benchmark('parse_status')
+def bench_parse_status() -> float:
+    """Форматирование статусов 10 000 работ из записей ответа."""
+    records = homework.check_response(make_response(10000))
+    return best_rate(
+        lambda: [homework.parse_status(record) for record in records],
+        len(records)
+    )
+
+
+@benchmark('process_response')
+def bench_process_response() -> float:
+    """Разбор ответа с 10 000 работ с дедупликацией, новое состояние."""
+    response = make_response(10000)
+    return best_rate(
+        lambda: homework.process_response(
+            SubscriberState(timestamp=0), response
+        ),
+        len(response['homeworks'])
+    )
+
+
+@benchmark('process_response_duplicates')
+def bench_process_response_duplicates() -> float:
+    """Повторный разбор уже известных работ."""
+    response = make_response(100)
+    state = SubscriberState(timestamp=0)
+    homework.process_response(state, response)
+    return best_rate(
+        lambda: [
+            homework.process_response(state, response) for _ in range(100)
+        ],
+        100 * len(response['homeworks'])
+    )
+
+
+@benchmark('poll_cycle')
+def bench_poll_cycle() -> float:
+    """Полный цикл опроса 200 подписчиков через заглушку API."""
+    subscribers_qty = 200
+    with FakePracticumAPI() as api:
+        tokens = api.populate(subscribers_qty, homeworks_per_student=3)
+        client = use_client(api, pool_size=4)
+        subscribers = [Subscriber(token, token, '1') for token in tokens]
+        bot = MockTelegramBot()
+
+        def cycle():
+            states = homework.sync_states({}, subscribers)
+            for state in states.values():
+                state.timestamp = 0
+            homework.poll_cycle(bot, subscribers, states)
+
+        rate = best_rate(cycle, subscribers_qty, rounds=3)
+        client.close()
+    return rate
+
+
+def import_seconds(module: str) -> float:
+    """Время импорта module в новом процессе по данным -X importtime."""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=BASE_DIR, capture_output=True, text=True, check=True
+    )
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        _, cumulative, name = line.split('|')
+        if name.strip() == module and not name.startswith('  '):
+            return int(cumulative) / 1_000_000
+    raise RuntimeError(f'Модуль {module} не найден в выводе importtime')
+
+
+@benchmark('import_homework')
+def bench_import_homework() -> float:
+    """Холодный импорт модуля бота в новом процессе."""
+    return 1 / min(import_seconds('homework') for _ in range(7))
+
+
+def run(names: list) -> dict:
+    """Выполняет бенчмарки и возвращает их результаты."""
+    logging.disable(logging.CRITICAL)
+    results = {}
+    for name in names:
+        results[name] = round(BENCHMARKS[name](), 1)
+        print(f'{name:32} {results[name]:>14,.1f} оп/с')
+    logging.disable(logging.NOTSET)
+    return results
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """Возвращает бенчмарки, замедлившиеся больше чем на tolerance."""
+    regressions = []
+    for name, rate in results.items():
+        expected = baseline.get(name)
+        if expected and rate < expected * (1 - tolerance):
+            regressions.append(
+                f'{name}: {rate:,.1f} оп/с при базовых {expected:,.1f}'
+            )
+    return regressions
+
+
+def main() -> None:
+    """Точка входа."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--save', action='store_true',
+                        help='сохранить результаты как базовые')
+    parser.add_argument('--only', nargs='*', choices=sorted(BENCHMARKS),
+                        help='запустить только указанные бенчмарки')
+    parser.add_argument('--tolerance', type=float, default=0.3,
+                        help='допустимое замедление, доля (по умолчанию 0.3)')
+    args = parser.parse_args()
+    results = run(args.only or list(BENCHMARKS))
+    if args.save:
+        baseline = {}
+        if os.path.exists(BASELINE_PATH):
+            with open(BASELINE_PATH, encoding='utf-8') as file:
+                baseline = json.load(file)
+        baseline.update(results)
+        with open(BASELINE_PATH, 'w', encoding='utf-8') as file:
+            json.dump(baseline, file, indent=2, sort_keys=True)
+            file.write('\n')
+        print(f'Базовые значения сохранены в {BASELINE_PATH}')
+        return
+    if not os.path.exists(BASELINE_PATH):
+        return
+    with open(BASELINE_PATH, encoding='utf-8') as file:
+        regressions = compare(results, json.load(file), args.tolerance)
+    for regression in regressions:
+        print(f'Регрессия: {regression}')
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+import sqlite3
+
+from subscribers import SubscriberState
+
+# Не больше стольких параметров в одном запросе SQLite.
+MAX_VARIABLES = 500
+
+
+class CheckpointStore:
+    """Контрольные точки опроса в базе SQLite.
+
+    База работает в режиме WAL, а состояния всех подписчиков за цикл
+    сохраняются одной транзакцией, поэтому после падения процесса
+    остаётся последняя целиком записанная контрольная точка.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.execute('PRAGMA synchronous=FULL')
+        with self._connection:
+            self._connection.execute(
+                'CREATE TABLE IF NOT EXISTS checkpoints ('
+                ' sub_id TEXT PRIMARY KEY,'
+                ' timestamp INTEGER NOT NULL,'
+                ' status TEXT,'
+                ' preview_message TEXT)'
+            )
+            self._connection.execute(
+                'CREATE TABLE IF NOT EXISTS seen_homeworks ('
+                ' sub_id TEXT NOT NULL,'
+                ' homework_key TEXT NOT NULL,'
+                ' status TEXT NOT NULL,'
+                ' date_updated TEXT NOT NULL,'
+                ' seen_at REAL NOT NULL,'
+                ' PRIMARY KEY (sub_id, homework_key, status, date_updated))'
+            )
+
+    def load_all(self) -> dict:
+        """Возвращает сохранённые состояния всех подписчиков."""
+        return self._load('', ())
+
+    def load(self, sub_ids: list) -> dict:
+        """Возвращает сохранённые состояния подписчиков sub_ids."""
+        states = {}
+        for start in range(0, len(sub_ids), MAX_VARIABLES):
+            chunk = list(sub_ids[start:start + MAX_VARIABLES])
+            placeholders = ', '.join('?' * len(chunk))
+            states.update(
+                self._load(f' WHERE sub_id IN ({placeholders})', chunk)
+            )
+        return states
+
+    def _load(self, where: str, params) -> dict:
+        states = {
+            sub_id: SubscriberState(
+                timestamp=timestamp, status=status,
+                preview_message=preview_message
+            )
+            for sub_id, timestamp, status, preview_message
+            in self._connection.execute(
+                'SELECT sub_id, timestamp, status, preview_message'
+                ' FROM checkpoints' + where, params
+            )
+        }
+        rows = self._connection.execute(
+            'SELECT sub_id, homework_key, status, date_updated, seen_at'
+            ' FROM seen_homeworks' + where + ' ORDER BY seen_at', params
+        )
+        for sub_id, homework_key, status, date_updated, seen_at in rows:
+            if sub_id in states:
+                states[sub_id].seen.add(
+                    (homework_key, status, date_updated), seen_at
+                )
+        return states
+
+    def save(self, states: dict) -> int:
+        """Сохраняет изменившиеся состояния одной транзакцией.
+
+        Возвращает число сохранённых подписчиков.
+        """
+        dirty = {
+            sub_id: state for sub_id, state in states.items() if state.dirty
+        }
+        if not dirty:
+            return 0
+        with self._connection:
+            self._connection.executemany(
+                'INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, ?)',
+                [
+                    (sub_id, state.timestamp, state.status,
+                     state.preview_message)
+                    for sub_id, state in dirty.items()
+                ]
+            )
+            self._connection.executemany(
+                'DELETE FROM seen_homeworks WHERE sub_id = ?',
+                [(sub_id,) for sub_id in dirty]
+            )
+            self._connection.executemany(
+                'INSERT INTO seen_homeworks VALUES (?, ?, ?, ?, ?)',
+                [
+                    (sub_id, *key, seen_at)
+                    for sub_id, state in dirty.items()
+                    for key, seen_at in state.seen.items()
+                ]
+            )
+        for state in dirty.values():
+            state.dirty = False
+        return len(dirty)
+
+    def close(self) -> None:
+        """Закрывает соединение с базой."""
+        self._connection.close()
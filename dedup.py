@@ -0,0 +1,46 @@
+from collections import OrderedDict
+import time
+from typing import Hashable, List, Optional, Tuple
+
+DEFAULT_MAX_SIZE = 128
+DEFAULT_TTL = 30 * 24 * 60 * 60
+
+
+class SeenCache:
+    """Множество недавно обработанных ключей с вытеснением LRU и TTL.
+
+    Размер ограничен max_size: при переполнении вытесняется ключ,
+    который дольше всего не встречался. Ключи старше ttl секунд
+    считаются невиданными.
+    """
+
+    def __init__(self, max_size: int = DEFAULT_MAX_SIZE,
+                 ttl: float = DEFAULT_TTL) -> None:
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+
+    def seen(self, key: Hashable) -> bool:
+        """Проверяет, встречался ли ключ в пределах TTL."""
+        seen_at = self._entries.get(key)
+        if seen_at is None:
+            return False
+        if time.time() - seen_at > self.ttl:
+            del self._entries[key]
+            return False
+        self._entries.move_to_end(key)
+        return True
+
+    def add(self, key: Hashable, seen_at: Optional[float] = None) -> None:
+        """Запоминает ключ."""
+        self._entries[key] = time.time() if seen_at is None else seen_at
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def items(self) -> List[Tuple[Hashable, float]]:
+        """Возвращает ключи со временем их добавления, от старых к новым."""
+        return list(self._entries.items())
+
+    def __len__(self) -> int:
+        return len(self._entries)
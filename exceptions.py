@@ -8,3 +8,11 @@ class EmptyResponseFromAPI(Exception):
 
 class RequestExceptionError(Exception):
     """Ошибка запроса."""
+
+
+class CircuitOpenError(Exception):
+    """Запросы к API временно приостановлены после серии сбоев."""
+
+
+class CycleDeadlineExceeded(Exception):
+    """Бюджет времени цикла опроса исчерпан до ответа API."""
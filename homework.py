@@ -1,128 +1,1014 @@
+from __future__ import annotations
+
+import atexit
+from contextlib import contextmanager
+import contextvars
+import functools
 from http import HTTPStatus
 import logging
+import math
 import os
 import sys
+import threading
 import time
-from typing import NoReturn
+from typing import Iterator, NoReturn, Optional, Union
 
 from dotenv import load_dotenv
-import requests
-import telegram
 
+from api_client import PracticumClient
+from checkpoint import CheckpointStore
 import exceptions
+from leader import LeaseLock
+from jsonlog import (ContextFilter, JsonFormatter, new_cycle_id,
+                     SUBSCRIBER_ID)
+from lazy import lazy_import, load_now
+from metrics import (API_FAILURES, API_LATENCY, LOOP_LAG, MESSAGES_FAILED,
+                     MESSAGES_SENT, POLL_LATENCY, POLLS, QUEUE_DEPTH,
+                     SCHEDULER_LAG, start_metrics_server)
+from pools import BoundedExecutor
+from records import (decode_json, HomeworkRecord, parse_homeworks,
+                     to_record)
+from resilience import CircuitBreaker, RetryPolicy
+from scheduler import AdaptiveInterval, PollScheduler
+from sender import build_digest, DeadLetterStore, SendQueue
+from sharding import get_ring
+from subscribers import (
+    ENV_SUBSCRIBER, Subscriber, SubscriberRegistry, SubscriberState
+)
+from webhook import EventReceiver
 
-load_dotenv()
+asyncio = lazy_import('asyncio')
+futures = lazy_import('concurrent.futures')
+requests = lazy_import('requests')
+telegram = lazy_import('telegram')
+
+# Файл .env читается только при запуске бота, а не при импорте модуля.
+if __name__ == '__main__':
+    load_dotenv()
 
 PRACTICUM_TOKEN = os.getenv('PRACTICUM_TOKEN')
 TELEGRAM_TOKEN = os.getenv('TELEGRAM_TOKEN')
 TELEGRAM_CHAT_ID = os.getenv('TELEGRAM_CHAT_ID')
+TELEGRAM_API_URL = os.getenv('TELEGRAM_API_URL')
 
 RETRY_PERIOD = 600
-ENDPOINT = 'https://practicum.yandex.ru/api/user_api/homework_statuses/'
+ENDPOINT = os.getenv(
+    'PRACTICUM_ENDPOINT',
+    'https://practicum.yandex.ru/api/user_api/homework_statuses/'
+)
 HEADERS = {'Authorization': f'OAuth {PRACTICUM_TOKEN}'}
 
+SUBSCRIBERS_DB = os.getenv('SUBSCRIBERS_DB')
+CHECKPOINT_DB = os.getenv('CHECKPOINT_DB')
+API_POOL_SIZE = int(os.getenv('API_POOL_SIZE', 0))
+API_CONNECT_TIMEOUT = float(os.getenv('API_CONNECT_TIMEOUT', 5))
+API_READ_TIMEOUT = float(os.getenv('API_READ_TIMEOUT', 30))
+CYCLE_DEADLINE = float(os.getenv('CYCLE_DEADLINE', RETRY_PERIOD))
+ADAPTIVE_POLLING = os.getenv('ADAPTIVE_POLLING') == '1'
+POLL_MIN_INTERVAL = float(os.getenv('POLL_MIN_INTERVAL', 60))
+POLL_MAX_INTERVAL = float(os.getenv('POLL_MAX_INTERVAL', 3600))
+POLL_SPREAD = float(os.getenv('POLL_SPREAD', 0))
+BACKOFF_BASE = float(os.getenv('BACKOFF_BASE', 60))
+BACKOFF_MAX = float(os.getenv('BACKOFF_MAX', 3600))
+BREAKER_THRESHOLD = int(os.getenv('BREAKER_THRESHOLD', 5))
+BREAKER_RESET_TIMEOUT = float(os.getenv('BREAKER_RESET_TIMEOUT', 300))
+SEND_QUEUE = os.getenv('SEND_QUEUE') == '1'
+SEND_GLOBAL_RATE = float(os.getenv('SEND_GLOBAL_RATE', 30))
+SEND_CHAT_RATE = float(os.getenv('SEND_CHAT_RATE', 1))
+SEND_WORKERS = int(os.getenv('SEND_WORKERS', 4))
+SEND_MAX_ATTEMPTS = int(os.getenv('SEND_MAX_ATTEMPTS', 5))
+DEAD_LETTER_PATH = os.getenv('DEAD_LETTER_PATH')
+DIGEST_WINDOW = float(os.getenv('DIGEST_WINDOW', 0))
+METRICS_PORT = int(os.getenv('METRICS_PORT', 0))
+ASYNC_MODE = os.getenv('ASYNC_MODE') == '1'
+ASYNC_CONCURRENCY = int(os.getenv('ASYNC_CONCURRENCY', 64))
+POLL_WORKERS = int(os.getenv('POLL_WORKERS', 0))
+POOL_QUEUE_SIZE = int(os.getenv('POOL_QUEUE_SIZE', 100))
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'DEBUG').upper()
+LOG_QUEUE = os.getenv('LOG_QUEUE') == '1'
+WEBHOOK_PORT = int(os.getenv('WEBHOOK_PORT', 0))
+WEBHOOK_SECRET = os.getenv('WEBHOOK_SECRET')
+WEBHOOK_HOST = os.getenv('WEBHOOK_HOST', '127.0.0.1')
+PUSH_ONLY = os.getenv('PUSH_ONLY') == '1'
+SHARD_INDEX = int(os.getenv('SHARD_INDEX', 0))
+SHARD_COUNT = int(os.getenv('SHARD_COUNT', 1))
+LEADER_LOCK_DB = os.getenv('LEADER_LOCK_DB')
+LEASE_TTL = float(os.getenv('LEASE_TTL', 30))
+LOG_FORMAT = os.getenv('LOG_FORMAT', 'text')
+
 HOMEWORK_VERDICTS = {
     'approved': 'Работа проверена: ревьюеру всё понравилось. Ура!',
     'reviewing': 'Работа взята на проверку ревьюером.',
     'rejected': 'Работа проверена: у ревьюера есть замечания.'
 }
 
+# Логгеры модулей бота; сторонние библиотеки остаются на уровне WARNING.
+BOT_LOGGERS = (__name__, 'leader', 'resilience', 'sender', 'webhook')
+LOOPBACK_HOSTS = ('127.0.0.1', '::1', 'localhost')
+
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.DEBUG)
-stream_handler = logging.StreamHandler()
-logger.addHandler(stream_handler)
-formatter = logging.Formatter(
-    '%(asctime)s, %(levelname)s, Путь - %(pathname)s, %(message)s'
+
+log_handler = None
+api_client = None
+send_queue = None
+poll_pool = None
+send_pool = None
+push_targets = {}
+shard_count = None
+lease = None
+leader_term = 0
+state_lock = threading.Lock()
+poll_interval = AdaptiveInterval(
+    RETRY_PERIOD, POLL_MIN_INTERVAL, POLL_MAX_INTERVAL
 )
-stream_handler.setFormatter(formatter)
-logger.debug('Старт Бота')
+poll_scheduler = PollScheduler(POLL_SPREAD)
+retry_policy = RetryPolicy(BACKOFF_BASE, BACKOFF_MAX)
+API_ERRORS = (
+    exceptions.InvalidResponseCode,
+    exceptions.EmptyResponseFromAPI,
+    exceptions.CircuitOpenError,
+)
+
+
+def setup_logging() -> logging.Handler:
+    """Настраивает вывод логов всех модулей бота.
+
+    При LOG_QUEUE записи выводятся отдельным потоком, который дописывает
+    очередь при завершении процесса. Повторный вызов ничего не меняет.
+    """
+    global log_handler
+    if log_handler is not None:
+        return log_handler
+    for logger_name in BOT_LOGGERS:
+        logging.getLogger(logger_name).setLevel(LOG_LEVEL)
+    stream_handler = logging.StreamHandler()
+    if LOG_FORMAT == 'json':
+        stream_handler.setFormatter(JsonFormatter())
+    else:
+        stream_handler.setFormatter(logging.Formatter(
+            '%(asctime)s, %(levelname)s, Путь - %(pathname)s, %(message)s'
+        ))
+    if LOG_QUEUE:
+        from logging.handlers import QueueHandler, QueueListener
+        import queue
+
+        log_queue = queue.SimpleQueue()
+        log_listener = QueueListener(log_queue, stream_handler)
+        log_listener.start()
+        atexit.register(log_listener.stop)
+        log_handler = QueueHandler(log_queue)
+    else:
+        log_handler = stream_handler
+    log_handler.addFilter(ContextFilter())
+    logging.getLogger().addHandler(log_handler)
+    return log_handler
 
 
 def check_tokens() -> bool:
     """Проверка доступности переменных окружения."""
+    if SUBSCRIBERS_DB:
+        return bool(TELEGRAM_TOKEN)
     return all((PRACTICUM_TOKEN, TELEGRAM_TOKEN, TELEGRAM_CHAT_ID))
 
 
 def send_message(bot: telegram.Bot, message: str) -> NoReturn:
     """Отправляет сообщение в Telegram чат."""
+    send_chat_message(bot, TELEGRAM_CHAT_ID, message)
+
+
+def send_chat_message(bot: telegram.Bot, chat_id: str,
+                      message: str) -> NoReturn:
+    """Отправляет сообщение в указанный Telegram чат."""
     try:
         bot.send_message(
-            chat_id=TELEGRAM_CHAT_ID,
+            chat_id=chat_id,
             text=message,
         )
-        logger.debug(f'Сообщение отправлено {message}')
+        logger.debug('Сообщение отправлено %s', message)
+        MESSAGES_SENT.inc()
     except telegram.TelegramError as telegram_error:
-        logger.error(f'Не удалось отправить сообщение {telegram_error}')
+        logger.error('Не удалось отправить сообщение %s', telegram_error)
+        MESSAGES_FAILED.inc()
 
 
 def get_api_answer(timestamp: int) -> dict:
-    """Запрос к эндпоинту API Yandex Practicum."""
-    try:
-        response = requests.get(
-            ENDPOINT, headers=HEADERS, params={'from_date': timestamp}
+    """Запрос к эндпоинту API Yandex Practicum.
+
+    Запрос безусловный, поэтому ответ всегда содержит тело.
+    """
+    return request_homework_statuses(timestamp, HEADERS, conditional=False)
+
+
+def get_subscriber_answer(subscriber: Subscriber, timestamp: int,
+                          deadline: Optional[float] = None
+                          ) -> Optional[dict]:
+    """Запрос к API Yandex Practicum с токеном подписчика."""
+    headers = HEADERS
+    if subscriber.practicum_token is not None:
+        headers = {'Authorization': f'OAuth {subscriber.practicum_token}'}
+    return request_homework_statuses(timestamp, headers, deadline)
+
+
+def get_api_client() -> PracticumClient:
+    """Возвращает общий клиент API, создавая его при первом вызове."""
+    global api_client
+    if api_client is None:
+        api_client = PracticumClient(
+            ENDPOINT, HEADERS, pool_size=API_POOL_SIZE,
+            connect_timeout=API_CONNECT_TIMEOUT,
+            read_timeout=API_READ_TIMEOUT,
+            breaker=CircuitBreaker(BREAKER_THRESHOLD, BREAKER_RESET_TIMEOUT),
         )
+    return api_client
+
+
+def request_homework_statuses(timestamp: int, headers: dict,
+                              deadline: Optional[float] = None,
+                              conditional: bool = True) -> Optional[dict]:
+    """Запрос статусов домашних работ с заданными заголовками.
+
+    Возвращает None, если на условный запрос API ответил, что данные
+    не изменились.
+    """
+    POLLS.inc()
+    try:
+        with API_LATENCY.time():
+            response = get_api_client().get(
+                params={'from_date': timestamp},
+                headers=headers,
+                deadline=deadline,
+                conditional=conditional,
+            )
     except requests.exceptions.RequestException as error:
-        logger.error(f'Ошибка при запросе к основному API: {error}')
+        logger.error('Ошибка при запросе к основному API: %s', error)
         raise exceptions.EmptyResponseFromAPI(
             f'Ошибка при запросе к основному API: {error}')
+    if response.status_code == HTTPStatus.NOT_MODIFIED:
+        return None
     if response.status_code != HTTPStatus.OK:
         code_api_msg = (
             f'{ENDPOINT} недоступен.'
             f' Код ответа API: {response.status_code}')
         logger.error(code_api_msg)
         raise exceptions.InvalidResponseCode(code_api_msg)
-    return response.json()
+    return decode_json(response)
 
 
 def check_response(response: dict) -> list:
-    """Проверяет ответ API на соответствие документации."""
+    """Проверяет ответ API на соответствие документации.
+
+    Возвращает работы из ответа в виде записей HomeworkRecord.
+    """
     if not isinstance(response, dict):
         raise TypeError('Ошибка в типе ответа API')
     homeworks = response.get('homeworks')
     if not isinstance(homeworks, list):
         raise TypeError('Homeworks не является списком')
-    return homeworks
+    return parse_homeworks(homeworks)
 
 
 def parse_status(homework: dict) -> str:
-    """Извлекает из информации статус домашней работы."""
-    if 'homework_name' not in homework:
+    """Извлекает из информации статус домашней работы.
+
+    Работа передаётся в формате API или записью HomeworkRecord.
+    """
+    if not isinstance(homework, HomeworkRecord):
+        homework = to_record(homework)
+    if homework.homework_name is None:
         raise KeyError('В ответе отсутсвует ключ homework_name')
-    homework_name = homework.get('homework_name')
-    status = homework.get('status')
-    if status not in HOMEWORK_VERDICTS:
-        raise ValueError(f'Неизвестный статус работы - {status}')
-    verdict = HOMEWORK_VERDICTS[status]
-    return f'Изменился статус проверки работы "{homework_name}". {verdict}'
+    if homework.status not in HOMEWORK_VERDICTS:
+        raise ValueError(f'Неизвестный статус работы - {homework.status}')
+    verdict = HOMEWORK_VERDICTS[homework.status]
+    return (
+        f'Изменился статус проверки работы "{homework.homework_name}". '
+        f'{verdict}'
+    )
+
+
+def notify(bot: telegram.Bot, subscriber: Subscriber,
+           message: str) -> NoReturn:
+    """Отправляет сообщение в чат подписчика.
+
+    Процесс, потерявший аренду, сообщения не отправляет.
+    """
+    if not holds_lease():
+        logger.warning('Аренда потеряна, сообщение подписчику %s не '
+                       'отправлено', subscriber.sub_id)
+        return
+    if send_queue is not None:
+        send_queue.put(subscriber.chat_id or TELEGRAM_CHAT_ID, message)
+    elif subscriber.chat_id is None:
+        send_message(bot, message)
+    else:
+        send_chat_message(bot, subscriber.chat_id, message)
+
+
+def deliver(bot: telegram.Bot, subscriber: Subscriber,
+            messages: list) -> NoReturn:
+    """Отправляет сообщения подписчику по порядку."""
+    for message in messages:
+        notify(bot, subscriber, message)
+
+
+def dispatch(bot: telegram.Bot, subscriber: Subscriber,
+             messages: list) -> NoReturn:
+    """Отправляет сообщения сразу или передаёт их пулу отправки.
+
+    Сообщения одного опроса отправляются одной задачей пула, чтобы
+    подписчик получал их в исходном порядке.
+    """
+    if not messages:
+        return
+    if send_pool is None or send_queue is not None:
+        deliver(bot, subscriber, messages)
+    else:
+        send_pool.submit(deliver, bot, subscriber, messages)
+
+
+def coalesce(messages: list) -> list:
+    """Объединяет сообщения одного опроса в сводку в режиме дайджеста.
+
+    С очередью отправки сообщения объединяет сама очередь за окно
+    DIGEST_WINDOW, поэтому здесь они возвращаются как есть.
+    """
+    if not DIGEST_WINDOW or send_queue is not None or len(messages) < 2:
+        return messages
+    return build_digest(messages)
+
+
+def start_pools() -> BoundedExecutor:
+    """Запускает пулы потоков для опроса API и отправки сообщений."""
+    global poll_pool, send_pool
+    get_api_client()
+    poll_pool = BoundedExecutor(POLL_WORKERS, POOL_QUEUE_SIZE, 'poll')
+    send_pool = BoundedExecutor(SEND_WORKERS, POOL_QUEUE_SIZE, 'send')
+    atexit.register(send_pool.shutdown)
+    atexit.register(poll_pool.shutdown, wait=False)
+    return poll_pool
+
+
+def start_send_queue(bot: telegram.Bot) -> SendQueue:
+    """Запускает очередь исходящих сообщений."""
+    global send_queue
+    send_queue = SendQueue(
+        bot,
+        global_rate=SEND_GLOBAL_RATE,
+        chat_rate=SEND_CHAT_RATE,
+        workers=SEND_WORKERS,
+        max_attempts=SEND_MAX_ATTEMPTS,
+        coalesce_window=DIGEST_WINDOW,
+        dead_letters=(
+            DeadLetterStore(DEAD_LETTER_PATH) if DEAD_LETTER_PATH else None
+        ),
+    ).start()
+    QUEUE_DEPTH.set_function(send_queue.__len__)
+    atexit.register(send_queue.stop)
+    return send_queue
+
+
+def process_response(state: SubscriberState,
+                     response: Optional[dict]) -> list:
+    """Разбирает ответ API и возвращает сообщения для отправки.
+
+    Сообщение формируется для каждой работы, статус которой отличается
+    от последнего известного. API отдаёт работы от новых к старым,
+    поэтому они обходятся в обратном порядке. Время последнего опроса
+    сдвигается только после разбора всех работ. Ответ None означает,
+    что статусы не изменились с прошлого опроса.
+    """
+    if response is None:
+        logger.debug('Статусы работ не изменились')
+        return []
+    records = check_response(response)
+    if not records:
+        logger.debug('Новые статусы работы отсутствуют')
+        return []
+    messages = []
+    with state_lock:
+        for record in reversed(records):
+            message = process_homework(state, record)
+            if message is not None:
+                messages.append(message)
+        state.timestamp = response.get('current_date', int(time.time()))
+        state.dirty = True
+    return messages
+
+
+def process_homework(state: SubscriberState,
+                     homework: Union[HomeworkRecord, dict]
+                     ) -> Optional[str]:
+    """Возвращает сообщение об изменении статуса одной работы.
+
+    Работа передаётся записью HomeworkRecord или в формате API. Уже
+    отправленные изменения распознаются по ключу из id работы, статуса
+    и даты обновления, без форматирования сообщения. Для работы
+    без имени или с неизвестным статусом возвращается сообщение о сбое,
+    а остальные работы ответа обрабатываются как обычно.
+    """
+    if not isinstance(homework, HomeworkRecord):
+        homework = to_record(homework)
+    key = homework[:3]
+    if state.seen.seen(key):
+        return None
+    try:
+        message = parse_status(homework)
+    except KeyError as error:
+        return report_failure(
+            state, f'Сбой в работе программы, не найден ключ: {error}'
+        )
+    except ValueError as error:
+        return report_failure(state, f'Сбой в работе программы: {error}')
+    state.seen.add(key)
+    state.status = key[1]
+    return message
+
+
+def report_failure(state: SubscriberState, message: str) -> Optional[str]:
+    """Возвращает сообщение о сбое, если оно не совпадает с предыдущим."""
+    logger.error(message)
+    if message == state.preview_message:
+        return None
+    state.preview_message = message
+    return message
+
+
+def handle_push_event(bot: telegram.Bot, sub_id: str,
+                      homework: dict) -> bool:
+    """Обрабатывает событие об изменении статуса работы.
+
+    Событие проходит ту же дедупликацию, что и ответы API. Возвращает
+    False, если подписчик неизвестен.
+    """
+    target = push_targets.get(sub_id)
+    if target is None:
+        return False
+    subscriber, state = target
+    with state_lock:
+        message = process_homework(state, homework)
+        if message is not None:
+            state.dirty = True
+    if message is not None:
+        notify(bot, subscriber, message)
+    return True
+
+
+def update_push_targets(subscribers: list, states: dict) -> NoReturn:
+    """Обновляет подписчиков, события которых принимает приёмник."""
+    global push_targets
+    if not WEBHOOK_PORT:
+        return
+    push_targets = {
+        subscriber.sub_id: (subscriber, states[subscriber.sub_id])
+        for subscriber in subscribers
+    }
+
+
+def validate_event(homework: dict) -> NoReturn:
+    """Проверяет, что в событии есть имя работы и известный статус."""
+    if not isinstance(homework.get('homework_name'), str):
+        raise ValueError('В событии нет имени работы homework_name')
+    if homework.get('status') not in HOMEWORK_VERDICTS:
+        raise ValueError(
+            f'Неизвестный статус работы - {homework.get("status")}'
+        )
+
+
+def start_push_receiver(bot: telegram.Bot) -> EventReceiver:
+    """Запускает приёмник событий об изменении статусов.
+
+    Вне локального адреса приёмник запускается только с WEBHOOK_SECRET,
+    иначе любой, кто видит порт, мог бы писать в чаты подписчиков.
+    """
+    if WEBHOOK_HOST not in LOOPBACK_HOSTS and not WEBHOOK_SECRET:
+        logger.critical(
+            'Для приёма событий на адресе %s нужен WEBHOOK_SECRET',
+            WEBHOOK_HOST
+        )
+        sys.exit()
+    receiver = EventReceiver(
+        functools.partial(handle_push_event, bot), WEBHOOK_SECRET,
+        validate_event
+    )
+    receiver.start(WEBHOOK_PORT, WEBHOOK_HOST)
+    logger.info('Приём событий на %s:%d', WEBHOOK_HOST, WEBHOOK_PORT)
+    return receiver
+
+
+@contextmanager
+def track_poll(subscriber: Subscriber) -> Iterator[dict]:
+    """Замеряет опрос подписчика и пишет в лог его итог.
+
+    Внутри блока записи лога помечаются идентификатором подписчика.
+    """
+    token = SUBSCRIBER_ID.set(subscriber.sub_id)
+    poll = {'outcome': 'ok'}
+    started = time.monotonic()
+    try:
+        yield poll
+    except Exception:
+        poll['outcome'] = 'error'
+        raise
+    finally:
+        duration = time.monotonic() - started
+        POLL_LATENCY.observe(duration)
+        logger.debug(
+            'Опрос подписчика %s: %s за %.3f с',
+            subscriber.sub_id, poll['outcome'], duration,
+            extra={
+                'event': 'poll', 'outcome': poll['outcome'],
+                'duration': round(duration, 6),
+            }
+        )
+        SUBSCRIBER_ID.reset(token)
+
+
+@contextmanager
+def track_cycle() -> Iterator[None]:
+    """Назначает циклу опроса идентификатор и пишет в лог его длительность."""
+    cycle_id = new_cycle_id()
+    started = time.monotonic()
+    try:
+        yield
+    finally:
+        duration = time.monotonic() - started
+        logger.debug(
+            'Цикл опроса %s завершён за %.3f с', cycle_id, duration,
+            extra={'event': 'cycle', 'duration': round(duration, 6)}
+        )
+
+
+def poll_subscriber(bot: telegram.Bot, subscriber: Subscriber,
+                    state: SubscriberState,
+                    deadline: Optional[float] = None) -> bool:
+    """Проверяет статусы работ подписчика и уведомляет об изменениях.
+
+    Возвращает False, если опрос пропущен из-за исчерпания бюджета цикла:
+    срок опроса тогда не меняется, и подписчик опрашивается в следующем
+    цикле.
+    """
+    previous_status = state.status
+    with track_poll(subscriber) as poll:
+        try:
+            response = get_subscriber_answer(
+                subscriber, state.timestamp, deadline
+            )
+        except exceptions.CycleDeadlineExceeded:
+            poll['outcome'] = 'skipped'
+            return False
+        except API_ERRORS as error:
+            poll['outcome'] = 'api_error'
+            postpone_after_error(subscriber, state, error)
+            return True
+        if not holds_lease():
+            poll['outcome'] = 'lease_lost'
+            return True
+        try:
+            dispatch(bot, subscriber, coalesce(
+                process_response(state, response)
+            ))
+        finally:
+            schedule_next_poll(state, previous_status)
+    return True
+
+
+def schedule_next_poll(state: SubscriberState,
+                       previous_status: Optional[str]) -> NoReturn:
+    """Назначает время следующего опроса подписчика.
+
+    Без адаптивного опроса интервал всегда равен RETRY_PERIOD.
+    """
+    if ADAPTIVE_POLLING:
+        state.interval = poll_interval.next_interval(
+            state.interval, state.status, state.status != previous_status
+        )
+    else:
+        state.interval = RETRY_PERIOD
+    state.next_poll = time.monotonic() + state.interval
+    state.failures = 0
+
+
+def postpone_after_error(subscriber: Subscriber, state: SubscriberState,
+                         error: Exception) -> NoReturn:
+    """Откладывает опрос подписчика после сбоя API."""
+    state.failures += 1
+    API_FAILURES.inc(error=type(error).__name__)
+    delay = retry_policy.delay(state.failures)
+    state.next_poll = time.monotonic() + delay
+    logger.warning(
+        'Сбой API для подписчика %s: %s. Повторный опрос через %.0f с',
+        subscriber.sub_id, error, delay
+    )
+
+
+def record_loop_lag(wake_at: float) -> NoReturn:
+    """Запоминает, насколько цикл опроса начался позже запланированного."""
+    LOOP_LAG.set(max(time.monotonic() - wake_at, 0))
+
+
+def due_subscribers(subscribers: list, states: dict) -> list:
+    """Возвращает подписчиков, которых пора опросить, в порядке сроков.
+
+    Сроки берутся из очереди опросов, которая сверяется с next_poll
+    состояний перед извлечением и перед расчётом паузы.
+    """
+    now = time.monotonic()
+    poll_scheduler.sync(states, now)
+    by_id = {subscriber.sub_id: subscriber for subscriber in subscribers}
+    due = []
+    for sub_id, due_at in poll_scheduler.pop_due(now):
+        if sub_id in by_id:
+            SCHEDULER_LAG.observe(now - due_at)
+            due.append(by_id[sub_id])
+    return due
+
+
+def next_delay(states: dict) -> float:
+    """Возвращает паузу до следующего цикла опроса.
+
+    Пауза длится до ближайшего срока в очереди опросов, округлённого
+    вверх до секунды, но не дольше RETRY_PERIOD. Резервный процесс
+    проверяет аренду чаще, чтобы быстрее её подхватить.
+    """
+    if lease is not None and not lease.is_leader:
+        return min(RETRY_PERIOD, lease.ttl / 3)
+    if not states:
+        return RETRY_PERIOD
+    now = time.monotonic()
+    poll_scheduler.sync(states, now)
+    return min(max(math.ceil(poll_scheduler.next_due() - now), 1),
+               RETRY_PERIOD)
+
+
+def poll_cycle(bot: telegram.Bot, subscribers: list,
+               states: dict) -> NoReturn:
+    """Опрашивает подписчиков, пока не исчерпан бюджет времени цикла."""
+    with track_cycle():
+        if poll_pool is not None:
+            pooled_poll_cycle(bot, subscribers, states)
+            return
+        deadline = time.monotonic() + CYCLE_DEADLINE
+        subscribers = due_subscribers(subscribers, states)
+        for index, subscriber in enumerate(subscribers):
+            if time.monotonic() >= deadline or not holds_lease():
+                break
+            try:
+                if not poll_subscriber(
+                    bot, subscriber, states[subscriber.sub_id], deadline
+                ):
+                    break
+            except Exception as error:
+                logger.exception(
+                    'Сбой при опросе подписчика %s: %s',
+                    subscriber.sub_id, error
+                )
+        else:
+            return
+        logger.warning(
+            'Цикл опроса прерван, пропущено подписчиков: %d',
+            len(subscribers) - index
+        )
+
+
+def pooled_poll_cycle(bot: telegram.Bot, subscribers: list,
+                      states: dict) -> NoReturn:
+    """Опрашивает подписчиков параллельно в пуле потоков.
+
+    Постановка задач в пул блокируется, пока его очередь заполнена.
+    Задача, дождавшаяся очереди после дедлайна, пропускает опрос.
+    """
+    deadline = time.monotonic() + CYCLE_DEADLINE
+    subscribers = due_subscribers(subscribers, states)
+    tasks = []
+    for subscriber in subscribers:
+        if time.monotonic() >= deadline or not holds_lease():
+            break
+        tasks.append(poll_pool.submit(
+            poll_subscriber, bot, subscriber, states[subscriber.sub_id],
+            deadline
+        ))
+    skipped = len(subscribers) - len(tasks)
+    for subscriber, task in zip(subscribers, tasks):
+        error = task.exception()
+        if error is not None:
+            logger.error(
+                'Сбой при опросе подписчика %s: %s', subscriber.sub_id, error
+            )
+        elif not task.result():
+            skipped += 1
+    if skipped:
+        logger.warning(
+            'Цикл опроса прерван, пропущено подписчиков: %d', skipped
+        )
+
+
+def load_subscribers(registry: SubscriberRegistry) -> list:
+    """Возвращает подписчиков из реестра или из переменных окружения.
+
+    Из реестра берутся только подписчики шарда этого обработчика.
+    Пока перераспределение не подтвердили все обработчики, шард
+    опрашивает лишь подписчиков, которые принадлежат ему и при старом,
+    и при новом числе шардов, поэтому один подписчик никогда
+    не опрашивается двумя шардами.
+    """
+    if registry is None:
+        return [ENV_SUBSCRIBER]
+    plan = registry.shard_plan()
+    current = plan.current or SHARD_COUNT
+    subscribers = registry.all()
+    if plan.pending is None:
+        return shard_subscribers(subscribers, current)
+    target = plan.pending or SHARD_COUNT
+    if registry.ack_rebalance(SHARD_INDEX, plan.epoch, max(current, target)):
+        return shard_subscribers(subscribers, target)
+    logger.info('Перераспределение шардов %d -> %d ждёт подтверждения',
+                current, target)
+    kept = {
+        subscriber.sub_id for subscriber in shard_members(subscribers, target)
+    }
+    return [
+        subscriber for subscriber in shard_subscribers(subscribers, current)
+        if subscriber.sub_id in kept
+    ]
+
+
+def shard_subscribers(subscribers: list, shards: int) -> list:
+    """Оставляет подписчиков шарда SHARD_INDEX из shards шардов."""
+    global shard_count
+    if shards != shard_count:
+        if shard_count is not None:
+            logger.info('Число шардов изменилось: %s -> %d',
+                        shard_count, shards)
+        if SHARD_INDEX >= shards:
+            logger.warning('Шард %d вне диапазона 0..%d, подписчиков нет',
+                           SHARD_INDEX, shards - 1)
+        shard_count = shards
+    return shard_members(subscribers, shards)
+
+
+def shard_members(subscribers: list, shards: int) -> list:
+    """Подписчики, которые при shards шардах относятся к SHARD_INDEX."""
+    if SHARD_INDEX >= shards:
+        return []
+    if shards <= 1:
+        return subscribers
+    ring = get_ring(shards)
+    return [
+        subscriber for subscriber in subscribers
+        if ring.shard(subscriber.sub_id) == SHARD_INDEX
+    ]
+
+
+def adopt_states(checkpoints: Optional[CheckpointStore], states: dict,
+                 subscribers: list) -> NoReturn:
+    """Загружает из контрольной точки состояния новых подписчиков.
+
+    Так подписчик, перешедший из другого шарда, сохраняет список уже
+    отправленных статусов и не получает их повторно.
+    """
+    if checkpoints is None:
+        return
+    missing = [
+        subscriber.sub_id for subscriber in subscribers
+        if subscriber.sub_id not in states
+    ]
+    if not missing:
+        return
+    adopted = checkpoints.load(missing)
+    if adopted:
+        states.update(adopted)
+        logger.info('Загружены состояния подписчиков: %d', len(adopted))
+
+
+def sync_states(states: dict, subscribers: list) -> dict:
+    """Сохраняет состояние текущих подписчиков и заводит его для новых."""
+    return {
+        subscriber.sub_id: states.get(subscriber.sub_id)
+        or SubscriberState(timestamp=int(time.time()))
+        for subscriber in subscribers
+    }
+
+
+async def run_blocking(semaphore: asyncio.Semaphore, func, *args):
+    """Выполняет блокирующий вызов в пуле потоков, не останавливая цикл."""
+    async with semaphore:
+        loop = asyncio.get_running_loop()
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(
+            None, functools.partial(context.run, func, *args)
+        )
+
+
+async def async_poll_subscriber(semaphore: asyncio.Semaphore,
+                                bot: telegram.Bot, subscriber: Subscriber,
+                                state: SubscriberState,
+                                deadline: float) -> bool:
+    """Асинхронно проверяет статусы работ подписчика.
+
+    Возвращает False, если опрос пропущен из-за исчерпания бюджета цикла,
+    в том числе когда дедлайн наступил, пока опрос ждал семафора.
+    """
+    if time.monotonic() >= deadline or not holds_lease():
+        return False
+    previous_status = state.status
+    with track_poll(subscriber) as poll:
+        try:
+            response = await run_blocking(
+                semaphore, get_subscriber_answer, subscriber,
+                state.timestamp, deadline
+            )
+        except exceptions.CycleDeadlineExceeded:
+            poll['outcome'] = 'skipped'
+            return False
+        except API_ERRORS as error:
+            poll['outcome'] = 'api_error'
+            postpone_after_error(subscriber, state, error)
+            return True
+        if not holds_lease():
+            poll['outcome'] = 'lease_lost'
+            return True
+        try:
+            for message in coalesce(process_response(state, response)):
+                await run_blocking(
+                    semaphore, notify, bot, subscriber, message
+                )
+        finally:
+            schedule_next_poll(state, previous_status)
+    return True
+
+
+async def async_poll_cycle(semaphore: asyncio.Semaphore, bot: telegram.Bot,
+                           subscribers: list, states: dict) -> NoReturn:
+    """Опрашивает всех подписчиков одновременно."""
+    deadline = time.monotonic() + CYCLE_DEADLINE
+    subscribers = due_subscribers(subscribers, states)
+    results = await asyncio.gather(
+        *(
+            async_poll_subscriber(
+                semaphore, bot, subscriber, states[subscriber.sub_id],
+                deadline
+            )
+            for subscriber in subscribers
+        ),
+        return_exceptions=True
+    )
+    for subscriber, result in zip(subscribers, results):
+        if isinstance(result, Exception):
+            logger.error(
+                'Сбой при опросе подписчика %s: %s', subscriber.sub_id, result
+            )
+    skipped = results.count(False)
+    if skipped:
+        logger.warning(
+            'Бюджет времени цикла исчерпан, пропущено подписчиков: %d', skipped
+        )
+
+
+def save_checkpoint(checkpoints: Optional[CheckpointStore],
+                    states: dict) -> NoReturn:
+    """Сохраняет контрольную точку опроса, если хранилище настроено.
+
+    Процесс без аренды не сохраняет состояния, чтобы не затереть
+    контрольную точку нового владельца.
+    """
+    if checkpoints is None or not holds_lease():
+        return
+    with state_lock:
+        saved = checkpoints.save(states)
+    if saved:
+        logger.debug('Сохранена контрольная точка подписчиков: %d', saved)
+
+
+def load_checkpoint(checkpoints: Optional[CheckpointStore]) -> dict:
+    """Загружает состояния подписчиков из контрольной точки."""
+    if checkpoints is None:
+        return {}
+    states = checkpoints.load_all()
+    logger.info('Загружена контрольная точка подписчиков: %d', len(states))
+    return states
+
+
+async def async_main(bot: telegram.Bot, registry: SubscriberRegistry,
+                     checkpoints: Optional[CheckpointStore]) -> NoReturn:
+    """Основной цикл бота в асинхронном режиме."""
+    asyncio.get_running_loop().set_default_executor(
+        futures.ThreadPoolExecutor(max_workers=ASYNC_CONCURRENCY)
+    )
+    semaphore = asyncio.Semaphore(ASYNC_CONCURRENCY)
+    states = load_checkpoint(checkpoints)
+    wake_at = time.monotonic()
+    while True:
+        try:
+            record_loop_lag(wake_at)
+            subscribers = load_subscribers(registry)
+            adopt_states(checkpoints, states, subscribers)
+            states = sync_states(states, subscribers)
+            active = is_active(checkpoints, states)
+            update_push_targets(subscribers if active else [], states)
+            if active and not PUSH_ONLY:
+                with track_cycle():
+                    await async_poll_cycle(
+                        semaphore, bot, subscribers, states
+                    )
+            save_checkpoint(checkpoints, states)
+        except Exception as error:
+            logger.exception('Сбой в работе программы: %s', error)
+        delay = next_delay(states)
+        wake_at = time.monotonic() + delay
+        await asyncio.sleep(delay)
+
+
+def start_lease() -> LeaseLock:
+    """Запускает аренду активного процесса для шарда SHARD_INDEX."""
+    global lease
+    lease = LeaseLock(LEADER_LOCK_DB, f'shard-{SHARD_INDEX}', LEASE_TTL)
+    lease.start()
+    atexit.register(lease.release)
+    if not lease.is_leader:
+        logger.info('Процесс %s в резерве для шарда %d',
+                    lease.owner, SHARD_INDEX)
+    return lease
+
+
+def holds_lease() -> bool:
+    """Проверяет, что процесс владеет арендой или работает без неё."""
+    return lease is None or lease.is_leader
+
+
+def is_active(checkpoints: Optional[CheckpointStore],
+              states: dict) -> bool:
+    """Проверяет, что процесс активен, а не находится в резерве.
+
+    Став активным, процесс перечитывает состояния подписчиков
+    из контрольной точки, сохранённой прежним владельцем аренды.
+    """
+    global leader_term
+    if lease is None:
+        return True
+    if not lease.is_leader:
+        return False
+    if lease.term != leader_term:
+        leader_term = lease.term
+        if checkpoints is not None:
+            with state_lock:
+                states.update(checkpoints.load(list(states)))
+    return True
+
+
+def start_services(bot: telegram.Bot) -> tuple:
+    """Запускает включённые настройками службы бота.
+
+    Возвращает реестр подписчиков и хранилище контрольных точек
+    или None вместо каждого из них. Отложенные модули загружаются
+    до запуска потоков, которые к ним обращаются.
+    """
+    load_now(requests, telegram, futures)
+    registry = SubscriberRegistry(SUBSCRIBERS_DB) if SUBSCRIBERS_DB else None
+    if METRICS_PORT:
+        start_metrics_server(METRICS_PORT)
+    if SEND_QUEUE:
+        start_send_queue(bot)
+    if POLL_WORKERS:
+        start_pools()
+    if WEBHOOK_PORT:
+        start_push_receiver(bot)
+    if LEADER_LOCK_DB:
+        start_lease()
+    checkpoints = CheckpointStore(CHECKPOINT_DB) if CHECKPOINT_DB else None
+    return registry, checkpoints
 
 
 def main() -> NoReturn:
     """Основная логика работы бота."""
+    setup_logging()
+    logger.debug('Старт Бота')
     if not check_tokens():
         logger.critical('Отсутствие обязательных переменных окружения!')
         sys.exit()
-    bot = telegram.Bot(token=TELEGRAM_TOKEN)
-    timestamp = int(time.time())
-    preview_message = None
+    if TELEGRAM_API_URL:
+        bot = telegram.Bot(token=TELEGRAM_TOKEN, base_url=TELEGRAM_API_URL)
+    else:
+        bot = telegram.Bot(token=TELEGRAM_TOKEN)
+    registry, checkpoints = start_services(bot)
+    if ASYNC_MODE:
+        asyncio.run(async_main(bot, registry, checkpoints))
+    states = load_checkpoint(checkpoints)
+    wake_at = time.monotonic()
     while True:
         try:
-            response = get_api_answer(timestamp)
-            if check_response(response):
-                homework = (response.get('homeworks'))[0]
-                timestamp = response.get('current_date', int(time.time()))
-                message = parse_status(homework)
-                if message != preview_message:
-                    send_message(bot, message)
-                preview_message = message
-            else:
-                logger.debug('Новые статусы работы отсутствуют')
-        except KeyError as error:
-            message = f'Сбой в работе программы, не найден ключ: {error}'
-            if message != preview_message:
-                send_message(bot, message)
-            preview_message = message
-        finally:
-            time.sleep(RETRY_PERIOD)
+            record_loop_lag(wake_at)
+            subscribers = load_subscribers(registry)
+            adopt_states(checkpoints, states, subscribers)
+            states = sync_states(states, subscribers)
+            active = is_active(checkpoints, states)
+            update_push_targets(subscribers if active else [], states)
+            if active and not PUSH_ONLY:
+                poll_cycle(bot, subscribers, states)
+            save_checkpoint(checkpoints, states)
+        except Exception as error:
+            logger.exception('Сбой в работе программы: %s', error)
+        delay = next_delay(states)
+        wake_at = time.monotonic() + delay
+        time.sleep(delay)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,58 @@
+from contextvars import ContextVar
+from datetime import datetime, timezone
+import json
+import logging
+import os
+
+CYCLE_ID: ContextVar = ContextVar('cycle_id', default=None)
+SUBSCRIBER_ID: ContextVar = ContextVar('subscriber_id', default=None)
+CONTEXT_FIELDS = ('cycle_id', 'subscriber_id')
+EXTRA_FIELDS = ('event', 'outcome', 'duration')
+
+
+def new_cycle_id() -> str:
+    """Назначает идентификатор текущему циклу опроса."""
+    cycle_id = os.urandom(6).hex()
+    CYCLE_ID.set(cycle_id)
+    return cycle_id
+
+
+class ContextFilter(logging.Filter):
+    """Добавляет к записи идентификаторы цикла и подписчика.
+
+    Фильтр выполняется в потоке, который пишет в лог, поэтому значения
+    сохраняются и при выводе через QueueListener.
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        """Заполняет поля контекста записи."""
+        record.cycle_id = CYCLE_ID.get()
+        record.subscriber_id = SUBSCRIBER_ID.get()
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """Выводит запись одной строкой JSON.
+
+    Помимо времени, уровня и текста в строку попадают идентификаторы
+    цикла и подписчика, а также поля event, outcome и duration,
+    переданные через extra.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        """Форматирует запись."""
+        data = {
+            'time': datetime.fromtimestamp(
+                record.created, timezone.utc
+            ).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        for field in CONTEXT_FIELDS + EXTRA_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                data[field] = value
+        if record.exc_info:
+            data['exc_info'] = self.formatException(record.exc_info)
+        return json.dumps(data, ensure_ascii=False)
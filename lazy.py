@@ -0,0 +1,37 @@
+import importlib.util
+import sys
+from types import ModuleType
+
+
+def lazy_import(name: str) -> ModuleType:
+    """Возвращает модуль, который загружается при первом обращении.
+
+    Уже загруженный модуль возвращается как есть. Иначе модуль сразу
+    регистрируется в sys.modules, а его код выполняется при первом
+    чтении атрибута, поэтому тяжёлые зависимости не замедляют импорт.
+    Подмодуль, как и при обычном импорте, становится атрибутом пакета.
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    parent, _, child = name.rpartition('.')
+    if parent:
+        setattr(sys.modules[parent], child, module)
+    return module
+
+
+def load_now(*modules: ModuleType) -> None:
+    """Завершает загрузку отложенных модулей в текущем потоке.
+
+    LazyLoader не потокобезопасен: если несколько потоков впервые
+    обращаются к модулю одновременно, часть из них видит его
+    недозагруженным. Поэтому модули, которые используются в пулах
+    потоков, загружаются до их запуска.
+    """
+    for module in modules:
+        getattr(module, '__name__')
@@ -0,0 +1,121 @@
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+def default_owner() -> str:
+    """Уникальное имя процесса для записи об аренде."""
+    return f'{socket.gethostname()}:{os.getpid()}:{os.urandom(4).hex()}'
+
+
+class LeaseLock:
+    """Аренда с продлением в базе SQLite для выбора активного процесса.
+
+    Аренда name принадлежит одному владельцу до expires_at. Владелец
+    продлевает её фоновым потоком каждые ttl / 3 секунд, а остальные
+    процессы с той же базой ждут в резерве и забирают аренду, как только
+    она истечёт или будет освобождена. Все процессы должны видеть один
+    файл базы.
+    """
+
+    def __init__(self, path: str, name: str, ttl: float = 30,
+                 owner: Optional[str] = None) -> None:
+        self.path = path
+        self.name = name
+        self.ttl = ttl
+        self.owner = owner or default_owner()
+        self.term = 0
+        self._expires_at = 0.0
+        self._stopped = threading.Event()
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(
+            path, timeout=ttl / 3, isolation_level=None,
+            check_same_thread=False
+        )
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.execute(
+            'CREATE TABLE IF NOT EXISTS leases ('
+            ' name TEXT PRIMARY KEY,'
+            ' owner TEXT NOT NULL,'
+            ' expires_at REAL NOT NULL)'
+        )
+
+    @property
+    def is_leader(self) -> bool:
+        """Владеет ли процесс неистёкшей арендой."""
+        return time.time() < self._expires_at
+
+    def acquire(self) -> bool:
+        """Получает или продлевает аренду. Возвращает True при успехе."""
+        with self._lock:
+            was_leader = self.is_leader
+            try:
+                acquired = self._try_acquire()
+            except sqlite3.Error as error:
+                logger.warning('Не удалось продлить аренду %s: %s',
+                               self.name, error)
+                acquired = False
+            if acquired and not was_leader:
+                self.term += 1
+                logger.info('Процесс %s стал активным для %s',
+                            self.owner, self.name)
+            elif was_leader and not self.is_leader:
+                logger.warning('Процесс %s потерял аренду %s',
+                               self.owner, self.name)
+            return acquired
+
+    def _try_acquire(self) -> bool:
+        now = time.time()
+        connection = self._connection
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            row = connection.execute(
+                'SELECT owner, expires_at FROM leases WHERE name = ?',
+                (self.name,)
+            ).fetchone()
+            if row and row[0] != self.owner and row[1] > now:
+                connection.execute('COMMIT')
+                self._expires_at = 0.0
+                return False
+            connection.execute(
+                'INSERT OR REPLACE INTO leases VALUES (?, ?, ?)',
+                (self.name, self.owner, now + self.ttl)
+            )
+            connection.execute('COMMIT')
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        self._expires_at = now + self.ttl
+        return True
+
+    def release(self) -> None:
+        """Освобождает аренду, чтобы резервный процесс забрал её сразу."""
+        self._stopped.set()
+        with self._lock:
+            self._expires_at = 0.0
+            try:
+                self._connection.execute(
+                    'DELETE FROM leases WHERE name = ? AND owner = ?',
+                    (self.name, self.owner)
+                )
+            except sqlite3.Error as error:
+                logger.warning('Не удалось освободить аренду %s: %s',
+                               self.name, error)
+
+    def start(self) -> 'LeaseLock':
+        """Запускает фоновое продление аренды."""
+        self.acquire()
+        threading.Thread(
+            target=self._heartbeat, name=f'lease-{self.name}', daemon=True
+        ).start()
+        return self
+
+    def _heartbeat(self) -> None:
+        while not self._stopped.wait(self.ttl / 3):
+            self.acquire()
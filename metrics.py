@@ -0,0 +1,253 @@
+from __future__ import annotations
+
+import bisect
+from contextlib import contextmanager
+import threading
+import time
+from typing import Callable, Iterator, List, Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from http.server import ThreadingHTTPServer
+
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+QUANTILES = (0.5, 0.95, 0.99)
+
+REGISTRY: List = []
+
+
+class Histogram:
+    """Гистограмма значений с фиксированными границами корзин.
+
+    Память не зависит от числа наблюдений, а квантили оцениваются
+    линейной интерполяцией внутри корзины, как в Prometheus.
+    """
+
+    def __init__(self, name: str, documentation: str,
+                 buckets: tuple = DEFAULT_BUCKETS) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+        self._count = 0
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def observe(self, value: float) -> None:
+        """Добавляет наблюдение."""
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+            self._count += 1
+
+    @contextmanager
+    def time(self) -> Iterator[None]:
+        """Замеряет длительность блока кода."""
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.observe(time.monotonic() - started)
+
+    @property
+    def count(self) -> int:
+        """Число наблюдений."""
+        return self._count
+
+    def quantile(self, q: float) -> float:
+        """Оценивает квантиль q по корзинам гистограммы."""
+        with self._lock:
+            counts = list(self._counts)
+            total = self._count
+        if not total:
+            return 0.0
+        rank = q * total
+        cumulative = 0
+        for index, bucket_count in enumerate(counts[:-1]):
+            if cumulative + bucket_count >= rank and bucket_count:
+                lower = self.buckets[index - 1] if index else 0.0
+                upper = self.buckets[index]
+                share = (rank - cumulative) / bucket_count
+                return lower + (upper - lower) * share
+            cumulative += bucket_count
+        return self.buckets[-1]
+
+    def render(self) -> str:
+        """Возвращает метрику в текстовом формате Prometheus."""
+        with self._lock:
+            counts = list(self._counts)
+            total_sum = self._sum
+            total = self._count
+        lines = [
+            f'# HELP {self.name} {self.documentation}',
+            f'# TYPE {self.name} histogram',
+        ]
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets, counts):
+            cumulative += bucket_count
+            lines.append(f'{self.name}_bucket{{le="{bound}"}} {cumulative}')
+        lines.append(f'{self.name}_bucket{{le="+Inf"}} {total}')
+        lines.append(f'{self.name}_sum {total_sum}')
+        lines.append(f'{self.name}_count {total}')
+        lines.append(f'# TYPE {self.name}_quantile gauge')
+        for q in QUANTILES:
+            lines.append(
+                f'{self.name}_quantile{{quantile="{q}"}} {self.quantile(q)}'
+            )
+        return '\n'.join(lines) + '\n'
+
+
+class Counter:
+    """Монотонно растущий счётчик, при необходимости с метками."""
+
+    def __init__(self, name: str, documentation: str,
+                 labels: tuple = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._values = {} if labels else {(): 0}
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        """Увеличивает счётчик значений меток labels на amount."""
+        key = tuple(str(labels[label]) for label in self.labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: str) -> float:
+        """Текущее значение счётчика для значений меток labels."""
+        key = tuple(str(labels[label]) for label in self.labels)
+        return self._values.get(key, 0)
+
+    def render(self) -> str:
+        """Возвращает метрику в текстовом формате Prometheus."""
+        with self._lock:
+            values = sorted(self._values.items())
+        lines = [
+            f'# HELP {self.name} {self.documentation}',
+            f'# TYPE {self.name} counter',
+        ]
+        for key, value in values:
+            labels = format_labels(self.labels, key)
+            lines.append(f'{self.name}{labels} {value}')
+        return '\n'.join(lines) + '\n'
+
+
+class Gauge:
+    """Текущее значение величины.
+
+    Значение задаётся set() или вычисляется функцией при каждом сборе.
+    """
+
+    def __init__(self, name: str, documentation: str) -> None:
+        self.name = name
+        self.documentation = documentation
+        self._value = 0.0
+        self._function: Optional[Callable[[], float]] = None
+        REGISTRY.append(self)
+
+    def set(self, value: float) -> None:
+        """Устанавливает значение."""
+        self._value = value
+
+    def set_function(self, function: Optional[Callable[[], float]]) -> None:
+        """Вычисляет значение вызовом function при каждом чтении."""
+        self._function = function
+
+    @property
+    def value(self) -> float:
+        """Текущее значение."""
+        if self._function is not None:
+            return self._function()
+        return self._value
+
+    def render(self) -> str:
+        """Возвращает метрику в текстовом формате Prometheus."""
+        return (
+            f'# HELP {self.name} {self.documentation}\n'
+            f'# TYPE {self.name} gauge\n'
+            f'{self.name} {self.value}\n'
+        )
+
+
+def format_labels(names: tuple, values: tuple) -> str:
+    """Форматирует метки в виде {name="value",...}."""
+    if not names:
+        return ''
+    pairs = ','.join(
+        f'{name}="{value}"' for name, value in zip(names, values)
+    )
+    return '{' + pairs + '}'
+
+
+def render_metrics() -> str:
+    """Возвращает все зарегистрированные метрики для сбора Prometheus."""
+    return ''.join(metric.render() for metric in REGISTRY)
+
+
+def start_metrics_server(port: int,
+                         host: str = '0.0.0.0') -> ThreadingHTTPServer:
+    """Запускает HTTP-сервер метрик в фоновом потоке.
+
+    http.server импортируется здесь: без сервера метрик он не нужен.
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        """Отдаёт метрики по адресу /metrics."""
+
+        def do_GET(self) -> None:
+            """Обрабатывает запрос сборщика метрик."""
+            if self.path != '/metrics':
+                self.send_error(404)
+                return
+            body = render_metrics().encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format: str, *args) -> None:
+            """Не пишет в лог каждый запрос сборщика."""
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+API_LATENCY = Histogram(
+    'practicum_api_request_seconds',
+    'Длительность запросов к API Yandex Practicum.'
+)
+POLL_LATENCY = Histogram(
+    'homework_poll_seconds',
+    'Длительность опроса одного подписчика с разбором и уведомлениями.'
+)
+SCHEDULER_LAG = Histogram(
+    'homework_scheduler_lag_seconds',
+    'Опоздание опроса подписчика относительно назначенного срока.',
+    buckets=(0.01, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0, 600.0)
+)
+POLLS = Counter('homework_polls_total', 'Число опросов API.')
+API_FAILURES = Counter(
+    'homework_api_errors_total', 'Ошибки запросов к API по классам.',
+    labels=('error',)
+)
+MESSAGES_SENT = Counter(
+    'homework_messages_sent_total', 'Отправленные сообщения Telegram.'
+)
+MESSAGES_FAILED = Counter(
+    'homework_messages_failed_total',
+    'Сообщения, которые не удалось отправить.'
+)
+QUEUE_DEPTH = Gauge(
+    'homework_send_queue_depth', 'Сообщения в очереди отправки.'
+)
+LOOP_LAG = Gauge(
+    'homework_loop_lag_seconds',
+    'Опоздание начала последнего цикла опроса относительно плана.'
+)
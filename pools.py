@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import contextvars
+import threading
+from typing import Callable, Optional
+
+from lazy import lazy_import
+
+futures = lazy_import('concurrent.futures')
+
+
+class BoundedExecutor:
+    """Пул потоков с ограниченной очередью задач.
+
+    Одновременно в пуле находится не больше workers + max_pending задач:
+    submit блокирует вызывающий поток, пока очередь заполнена, поэтому
+    цикл опроса не набирает задачи быстрее, чем пул их выполняет.
+    Задачи выполняются в копии контекста вызывающего потока, чтобы
+    в записях лога сохранялся идентификатор цикла.
+    """
+
+    def __init__(self, workers: int, max_pending: int = 0,
+                 name: str = 'pool') -> None:
+        self.workers = workers
+        self.max_pending = max_pending
+        self._slots = threading.BoundedSemaphore(workers + max_pending)
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._executor = futures.ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix=name
+        )
+
+    def submit(self, func: Callable, *args) -> futures.Future:
+        """Ставит задачу в пул, дожидаясь свободного места в очереди."""
+        self._slots.acquire()
+        with self._lock:
+            self._pending += 1
+        context = contextvars.copy_context()
+        try:
+            future = self._executor.submit(context.run, func, *args)
+        except BaseException:
+            self._release()
+            raise
+        future.add_done_callback(self._release)
+        return future
+
+    def _release(self, future: Optional[futures.Future] = None) -> None:
+        with self._lock:
+            self._pending -= 1
+        self._slots.release()
+
+    def __len__(self) -> int:
+        return self._pending
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Останавливает пул, по умолчанию дождавшись выполнения задач."""
+        self._executor.shutdown(wait=wait)
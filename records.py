@@ -0,0 +1,62 @@
+from typing import List, NamedTuple, Optional
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class HomeworkRecord(NamedTuple):
+    """Работа из ответа API с полями, которые использует бот.
+
+    Первые три поля образуют ключ, по которому распознаются уже
+    отправленные изменения статуса: record[:3]. key — id работы,
+    а без него имя работы; None, если нет ни того, ни другого.
+    """
+
+    key: Optional[str]
+    status: Optional[str]
+    date_updated: str
+    homework_name: Optional[str]
+
+
+# Конструктор кортежа без разбора аргументов по именам, как у _make.
+_new_record = tuple.__new__
+
+
+def to_record(homework: dict) -> HomeworkRecord:
+    """Создаёт запись из работы в формате API."""
+    get = homework.get
+    name = get('homework_name')
+    key = get('id')
+    if key is None:
+        key = name
+    return _new_record(HomeworkRecord, (
+        None if key is None else str(key), get('status'),
+        get('date_updated') or '', name
+    ))
+
+
+def parse_homeworks(homeworks: list) -> List[HomeworkRecord]:
+    """Проверяет работы из ответа API и переводит их в записи за один проход.
+
+    Если работа не является словарём, вызывает TypeError.
+    """
+    records = []
+    for homework in homeworks:
+        if not isinstance(homework, dict):
+            raise TypeError('Работа в ответе API не является словарём')
+        records.append(to_record(homework))
+    return records
+
+
+def decode_json(response) -> object:
+    """Декодирует тело ответа API.
+
+    Если установлен orjson, тело декодируется им, иначе и для ответов
+    без content используется response.json().
+    """
+    content = getattr(response, 'content', None)
+    if orjson is None or not isinstance(content, bytes):
+        return response.json()
+    return orjson.loads(content)
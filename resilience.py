@@ -0,0 +1,96 @@
+import logging
+import random
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class RetryPolicy:
+    """Экспоненциальная задержка повторов со случайным разбросом.
+
+    Половина задержки фиксирована, вторая половина случайна, поэтому
+    повторы от многих воркеров не приходят к API одновременно.
+    """
+
+    def __init__(self, base: float, max_delay: float,
+                 factor: float = 2.0) -> None:
+        self.base = base
+        self.max_delay = max_delay
+        self.factor = factor
+
+    def delay(self, attempt: int) -> float:
+        """Возвращает задержку перед повтором номер attempt (с единицы)."""
+        ceiling = min(
+            self.max_delay, self.base * self.factor ** max(attempt - 1, 0)
+        )
+        return ceiling / 2 + random.uniform(0, ceiling / 2)
+
+
+class CircuitBreaker:
+    """Автоматический выключатель запросов к внешнему сервису.
+
+    После failure_threshold сбоев подряд цепь размыкается и запросы
+    отклоняются без обращения к сервису. Через reset_timeout секунд
+    пропускается один пробный запрос: его успех замыкает цепь,
+    неудача снова размыкает её.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half-open'
+
+    def __init__(self, failure_threshold: int = 5,
+                 reset_timeout: float = 60.0) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self._opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """Решает, можно ли выполнить запрос."""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and (
+                time.monotonic() - self._opened_at >= self.reset_timeout
+            ):
+                self.state = self.HALF_OPEN
+                logger.info('Пробный запрос после размыкания цепи')
+                return True
+            return False
+
+    def record_success(self) -> None:
+        """Учитывает успешный запрос."""
+        with self._lock:
+            if self.state != self.CLOSED:
+                logger.info('Цепь замкнута, запросы к API возобновлены')
+            self.state = self.CLOSED
+            self.failures = 0
+
+    def cancel(self) -> None:
+        """Отменяет пропущенный запрос, не учитывая его итог.
+
+        Если это был пробный запрос, следующий запрос снова станет пробным.
+        """
+        with self._lock:
+            if self.state == self.HALF_OPEN:
+                self.state = self.OPEN
+
+    def record_failure(self) -> None:
+        """Учитывает неудачный запрос."""
+        with self._lock:
+            self.failures += 1
+            if (
+                self.state == self.HALF_OPEN
+                or self.failures >= self.failure_threshold
+            ):
+                if self.state != self.OPEN:
+                    logger.warning(
+                        'Цепь разомкнута после %d сбоев, пауза %s с',
+                        self.failures, self.reset_timeout
+                    )
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
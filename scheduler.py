@@ -0,0 +1,104 @@
+import heapq
+import itertools
+from typing import Dict, List, Optional, Tuple
+
+REVIEWING_STATUS = 'reviewing'
+
+
+class AdaptiveInterval:
+    """Адаптивный интервал опроса API.
+
+    Когда работа только что взята на проверку, вердикт скорее всего
+    появится скоро, поэтому интервал сбрасывается до минимального.
+    После вердикта интервал возвращается к базовому, а в периоды
+    без изменений растёт экспоненциально до максимального. Пока работа
+    на проверке, интервал не превышает базовый.
+    """
+
+    def __init__(self, base: float, min_interval: float,
+                 max_interval: float, factor: float = 2.0) -> None:
+        self.base = base
+        self.min_interval = min_interval
+        self.max_interval = max(max_interval, base)
+        self.factor = factor
+
+    def next_interval(self, interval: Optional[float],
+                      status: Optional[str], changed: bool) -> float:
+        """Возвращает интервал до следующего опроса."""
+        if changed:
+            if status == REVIEWING_STATUS:
+                return self.min_interval
+            return self.base
+        if interval is None:
+            return self.base
+        limit = self.base if status == REVIEWING_STATUS else self.max_interval
+        return max(min(interval * self.factor, limit), self.min_interval)
+
+
+class PollScheduler:
+    """Очередь опросов по времени следующего опроса (двоичная куча).
+
+    Ближайший срок находится за O(1), а извлечение наступивших сроков
+    занимает O(log n) на подписчика. Повторное планирование не удаляет
+    старую запись из кучи: устаревшие записи пропускаются при извлечении.
+
+    Подписчики, которых ещё не опрашивали (next_poll == 0), равномерно
+    распределяются по окну spread_window секунд, чтобы не опрашивать
+    всех одновременно после запуска.
+    """
+
+    def __init__(self, spread_window: float = 0) -> None:
+        self.spread_window = spread_window
+        self._heap: List[Tuple[float, int, str]] = []
+        self._due: Dict[str, float] = {}
+        self._sequence = itertools.count()
+
+    def schedule(self, key: str, due_at: float) -> None:
+        """Назначает опрос key на момент due_at."""
+        if self._due.get(key) == due_at:
+            return
+        self._due[key] = due_at
+        heapq.heappush(self._heap, (due_at, next(self._sequence), key))
+
+    def sync(self, states: dict, now: float) -> None:
+        """Приводит очередь к состояниям подписчиков states."""
+        for key in [key for key in self._due if key not in states]:
+            del self._due[key]
+        fresh = [
+            state for state in states.values() if not state.next_poll
+        ]
+        for index, state in enumerate(fresh):
+            state.next_poll = now + self.spread_window * index / len(fresh)
+        for key, state in states.items():
+            self.schedule(key, state.next_poll)
+        if len(self._heap) > 2 * len(self._due) + 64:
+            self._compact()
+
+    def pop_due(self, now: float) -> List[Tuple[str, float]]:
+        """Извлекает наступившие сроки в порядке времени."""
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            due_at, _, key = heapq.heappop(self._heap)
+            if self._due.get(key) == due_at:
+                del self._due[key]
+                due.append((key, due_at))
+        return due
+
+    def next_due(self) -> Optional[float]:
+        """Ближайший срок опроса или None для пустой очереди."""
+        while self._heap:
+            due_at, _, key = self._heap[0]
+            if self._due.get(key) == due_at:
+                return due_at
+            heapq.heappop(self._heap)
+        return None
+
+    def _compact(self) -> None:
+        self._heap = [
+            (due_at, sequence, key) for due_at, sequence, key in self._heap
+            if self._due.get(key) == due_at
+        ]
+        heapq.heapify(self._heap)
+
+    def __len__(self) -> int:
+        return len(self._due)
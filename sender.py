@@ -0,0 +1,321 @@
+from collections import deque
+from dataclasses import dataclass
+import heapq
+import itertools
+import json
+import logging
+import threading
+import time
+from typing import Optional
+
+from lazy import lazy_import
+from metrics import MESSAGES_FAILED, MESSAGES_SENT
+from resilience import RetryPolicy
+
+telegram = lazy_import('telegram')
+logger = logging.getLogger(__name__)
+
+# telegram.constants.MAX_MESSAGE_LENGTH, без импорта библиотеки.
+MAX_MESSAGE_LENGTH = 4096
+
+DIGEST_SEPARATOR = '\n\n'
+
+
+def split_text(text: str, limit: int = MAX_MESSAGE_LENGTH) -> list:
+    """Делит текст на части не длиннее limit, по возможности по строкам."""
+    parts = []
+    while len(text) > limit:
+        cut = text.rfind('\n', 0, limit + 1)
+        if cut <= 0:
+            cut = text.rfind(' ', 0, limit + 1)
+        if cut <= 0:
+            cut = limit
+        parts.append(text[:cut])
+        text = text[cut:].lstrip('\n ')
+    parts.append(text)
+    return parts
+
+
+def build_digest(texts: list, limit: int = MAX_MESSAGE_LENGTH) -> list:
+    """Объединяет сообщения в сводки не длиннее limit символов."""
+    digests = []
+    current = ''
+    for text in texts:
+        for part in split_text(text, limit):
+            candidate = current + DIGEST_SEPARATOR + part if current else part
+            if len(candidate) <= limit:
+                current = candidate
+                continue
+            digests.append(current)
+            current = part
+    if current:
+        digests.append(current)
+    return digests
+
+
+class TokenBucket:
+    """Ведро токенов: rate событий в секунду, не больше capacity подряд."""
+
+    def __init__(self, rate: float, capacity: float = 1) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+
+    def delay(self, now: float) -> float:
+        """Возвращает время ожидания следующего токена."""
+        self.tokens = min(
+            self.capacity,
+            self.tokens + max(now - self.updated, 0) * self.rate
+        )
+        self.updated = max(now, self.updated)
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def consume(self) -> None:
+        """Расходует токен."""
+        self.tokens -= 1
+
+
+@dataclass
+class OutgoingMessage:
+    """Сообщение, ожидающее отправки."""
+
+    chat_id: str
+    text: str
+    attempts: int = 0
+
+
+class DeadLetterStore:
+    """Файл JSON Lines с сообщениями, которые не удалось доставить."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+
+    def add(self, message: OutgoingMessage, error: Exception) -> None:
+        """Записывает недоставленное сообщение."""
+        record = {
+            'chat_id': message.chat_id,
+            'text': message.text,
+            'attempts': message.attempts,
+            'error': str(error),
+            'failed_at': int(time.time()),
+        }
+        with self._lock, open(self.path, 'a', encoding='utf-8') as file:
+            file.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+
+class SendQueue:
+    """Очередь исходящих сообщений Telegram.
+
+    Сообщения отправляются пулом потоков с общим ограничением частоты
+    и ограничением на чат. Порядок сообщений в одном чате сохраняется.
+    Ответ RetryAfter откладывает отправку в чат на указанное время,
+    сетевые ошибки повторяются с экспоненциальной задержкой, а после
+    max_attempts попыток или при постоянной ошибке сообщение уходит
+    в хранилище недоставленных. Если в очереди max_size сообщений,
+    put() ждёт освобождения места.
+
+    При coalesce_window > 0 первое сообщение в чат ждёт столько секунд,
+    и всё, что накопилось для чата за это время, отправляется одной
+    сводкой, разбитой на части по лимиту длины сообщения Telegram.
+    """
+
+    def __init__(self, bot, global_rate: float = 30, chat_rate: float = 1,
+                 workers: int = 4, max_attempts: int = 5,
+                 max_size: int = 10000, coalesce_window: float = 0,
+                 retry_policy: Optional[RetryPolicy] = None,
+                 dead_letters: Optional[DeadLetterStore] = None) -> None:
+        self.bot = bot
+        self.chat_rate = chat_rate
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.max_size = max_size
+        self.coalesce_window = coalesce_window
+        self.retry_policy = retry_policy or RetryPolicy(1, 60)
+        self.dead_letters = dead_letters
+        self.sent = 0
+        self.failed = 0
+        self._global = TokenBucket(global_rate, global_rate)
+        self._pending = {}
+        self._ready = []
+        self._in_flight = set()
+        self._chat_next = {}
+        self._size = 0
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+        self._threads = []
+        self._stopping = False
+
+    def put(self, chat_id: str, text: str) -> None:
+        """Ставит сообщение в очередь."""
+        with self._condition:
+            while self._size >= self.max_size:
+                self._condition.wait()
+            chat_id = str(chat_id)
+            chat = self._pending.setdefault(chat_id, deque())
+            chat.append(OutgoingMessage(chat_id, text))
+            self._size += 1
+            if len(chat) == 1 and chat_id not in self._in_flight:
+                self._schedule(chat_id, max(
+                    time.monotonic() + self.coalesce_window,
+                    self._chat_next.pop(chat_id, 0)
+                ))
+            self._condition.notify_all()
+
+    def start(self) -> 'SendQueue':
+        """Запускает потоки отправки."""
+        for number in range(self.workers):
+            thread = threading.Thread(
+                target=self._work, name=f'send-queue-{number}', daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def join(self, timeout: Optional[float] = None) -> bool:
+        """Ждёт опустошения очереди. Возвращает True, если она пуста."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            while self._size:
+                remaining = (
+                    None if deadline is None else deadline - time.monotonic()
+                )
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._condition.wait(remaining)
+        return True
+
+    def stop(self, timeout: float = 10) -> None:
+        """Дожидается отправки очереди и останавливает потоки.
+
+        Не отправленные за timeout сообщения уходят в недоставленные.
+        """
+        self.join(timeout)
+        with self._condition:
+            self._stopping = True
+            self._condition.notify_all()
+            leftovers = [
+                message for chat in self._pending.values() for message in chat
+            ]
+            self._pending.clear()
+            self._ready.clear()
+            self._size = 0
+        for message in leftovers:
+            self._dead_letter(
+                message, telegram.error.TelegramError('Остановка очереди')
+            )
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _schedule(self, chat_id: str, ready_at: float) -> None:
+        heapq.heappush(self._ready, (ready_at, next(self._sequence), chat_id))
+
+    def _next_message(self) -> Optional[OutgoingMessage]:
+        with self._condition:
+            while not self._stopping:
+                now = time.monotonic()
+                if self._ready and self._ready[0][0] <= now:
+                    wait = self._global.delay(now)
+                    if not wait:
+                        _, _, chat_id = heapq.heappop(self._ready)
+                        self._global.consume()
+                        self._in_flight.add(chat_id)
+                        if self.coalesce_window:
+                            self._coalesce(chat_id)
+                        return self._pending[chat_id][0]
+                else:
+                    wait = self._ready[0][0] - now if self._ready else None
+                self._condition.wait(wait)
+        return None
+
+    def _coalesce(self, chat_id: str) -> None:
+        chat = self._pending[chat_id]
+        if len(chat) < 2:
+            return
+        attempts = chat[0].attempts
+        digests = build_digest([message.text for message in chat])
+        self._size -= len(chat) - len(digests)
+        chat.clear()
+        chat.extend(
+            OutgoingMessage(chat_id, text, attempts) for text in digests
+        )
+        self._condition.notify_all()
+
+    def _work(self) -> None:
+        while True:
+            message = self._next_message()
+            if message is None:
+                return
+            self._deliver(message)
+
+    def _deliver(self, message: OutgoingMessage) -> None:
+        try:
+            self.bot.send_message(chat_id=message.chat_id, text=message.text)
+        except telegram.error.RetryAfter as error:
+            logger.warning(
+                'Лимит Telegram для чата %s, повтор через %s с',
+                message.chat_id, error.retry_after
+            )
+            self._release(message, retry_in=error.retry_after)
+        except telegram.error.BadRequest as error:
+            self._finish(message, error)
+        except telegram.error.NetworkError as error:
+            message.attempts += 1
+            if message.attempts >= self.max_attempts:
+                self._finish(message, error)
+            else:
+                self._release(
+                    message,
+                    retry_in=self.retry_policy.delay(message.attempts)
+                )
+        except telegram.error.TelegramError as error:
+            self._finish(message, error)
+        else:
+            self._finish(message)
+
+    def _release(self, message: OutgoingMessage, retry_in: float) -> None:
+        with self._condition:
+            self._in_flight.discard(message.chat_id)
+            self._schedule(message.chat_id, time.monotonic() + retry_in)
+            self._condition.notify_all()
+
+    def _finish(self, message: OutgoingMessage,
+                error: Optional[Exception] = None) -> None:
+        if error is None:
+            self.sent += 1
+            MESSAGES_SENT.inc()
+            logger.debug('Сообщение отправлено в чат %s', message.chat_id)
+        else:
+            self.failed += 1
+            MESSAGES_FAILED.inc()
+            self._dead_letter(message, error)
+        with self._condition:
+            self._in_flight.discard(message.chat_id)
+            chat = self._pending.get(message.chat_id)
+            if chat:
+                chat.popleft()
+                self._size -= 1
+                next_at = time.monotonic()
+                if error is None:
+                    next_at += 1 / self.chat_rate
+                if chat:
+                    self._schedule(message.chat_id, next_at)
+                else:
+                    del self._pending[message.chat_id]
+                    self._chat_next[message.chat_id] = next_at
+            self._condition.notify_all()
+
+    def _dead_letter(self, message: OutgoingMessage,
+                     error: Exception) -> None:
+        logger.error(
+            'Не удалось отправить сообщение в чат %s: %s',
+            message.chat_id, error
+        )
+        if self.dead_letters is not None:
+            self.dead_letters.add(message, error)
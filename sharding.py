@@ -0,0 +1,44 @@
+import bisect
+import functools
+import hashlib
+
+DEFAULT_REPLICAS = 100
+
+
+def stable_hash(key: str) -> int:
+    """Хеш строки, одинаковый во всех процессах и запусках."""
+    return int.from_bytes(
+        hashlib.blake2b(key.encode(), digest_size=8).digest(), 'big'
+    )
+
+
+class HashRing:
+    """Кольцо согласованного хеширования для распределения по шардам.
+
+    Каждый шард занимает replicas точек на кольце, а ключ относится
+    к шарду первой точки после его хеша. При изменении числа шардов
+    с N на N + 1 к новому шарду переходит около 1 / (N + 1) ключей,
+    остальные остаются на месте.
+    """
+
+    def __init__(self, shards: int,
+                 replicas: int = DEFAULT_REPLICAS) -> None:
+        self.shards = shards
+        points = sorted(
+            (stable_hash(f'shard-{shard}-{replica}'), shard)
+            for shard in range(shards)
+            for replica in range(replicas)
+        )
+        self._hashes = [point for point, _ in points]
+        self._owners = [shard for _, shard in points]
+
+    def shard(self, key: str) -> int:
+        """Возвращает номер шарда для ключа."""
+        index = bisect.bisect(self._hashes, stable_hash(key))
+        return self._owners[index % len(self._owners)]
+
+
+@functools.lru_cache(maxsize=8)
+def get_ring(shards: int) -> HashRing:
+    """Возвращает кольцо для заданного числа шардов."""
+    return HashRing(shards)
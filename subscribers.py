@@ -0,0 +1,241 @@
+import argparse
+from dataclasses import dataclass, field
+import sqlite3
+from typing import Iterator, List, NamedTuple, Optional
+
+from dedup import SeenCache
+
+
+class Subscriber(NamedTuple):
+    """Подписчик: пара токена Практикума и чата Telegram.
+
+    Значение None в полях означает, что токен или чат берутся
+    из переменных окружения бота.
+    """
+
+    sub_id: str
+    practicum_token: Optional[str] = None
+    chat_id: Optional[str] = None
+
+
+ENV_SUBSCRIBER = Subscriber('env')
+
+
+class ShardPlan(NamedTuple):
+    """Число шардов из реестра и незавершённое перераспределение.
+
+    current — действующее число шардов, pending — новое число, которое
+    вступит в силу, когда все обработчики подтвердят эпоху epoch.
+    None в current и 0 в pending означают число из SHARD_COUNT,
+    None в pending — что перераспределения нет.
+    """
+
+    current: Optional[int]
+    pending: Optional[int]
+    epoch: int
+
+
+@dataclass
+class SubscriberState:
+    """Состояние опроса API для одного подписчика."""
+
+    timestamp: int
+    preview_message: Optional[str] = None
+    status: Optional[str] = None
+    interval: Optional[float] = None
+    next_poll: float = 0.0
+    failures: int = 0
+    seen: SeenCache = field(default_factory=SeenCache)
+    dirty: bool = False
+
+
+class SubscriberRegistry:
+    """Реестр подписчиков, хранящийся в базе SQLite."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute(
+            'CREATE TABLE IF NOT EXISTS subscribers ('
+            ' sub_id TEXT PRIMARY KEY,'
+            ' practicum_token TEXT NOT NULL,'
+            ' chat_id TEXT NOT NULL)'
+        )
+        self._connection.execute(
+            'CREATE TABLE IF NOT EXISTS settings ('
+            ' key TEXT PRIMARY KEY,'
+            ' value TEXT NOT NULL)'
+        )
+        self._connection.execute(
+            'CREATE TABLE IF NOT EXISTS shard_acks ('
+            ' shard INTEGER PRIMARY KEY,'
+            ' epoch INTEGER NOT NULL)'
+        )
+        self._connection.commit()
+
+    def add(self, sub_id: str, practicum_token: str, chat_id: str) -> None:
+        """Добавляет подписчика или обновляет его данные."""
+        with self._connection:
+            self._connection.execute(
+                'INSERT OR REPLACE INTO subscribers VALUES (?, ?, ?)',
+                (sub_id, practicum_token, chat_id)
+            )
+
+    def remove(self, sub_id: str) -> None:
+        """Удаляет подписчика из реестра."""
+        with self._connection:
+            self._connection.execute(
+                'DELETE FROM subscribers WHERE sub_id = ?', (sub_id,)
+            )
+
+    def all(self) -> List[Subscriber]:
+        """Возвращает всех подписчиков реестра."""
+        rows = self._connection.execute(
+            'SELECT sub_id, practicum_token, chat_id FROM subscribers'
+            ' ORDER BY sub_id'
+        )
+        return [Subscriber(*row) for row in rows]
+
+    def _setting(self, key: str) -> Optional[int]:
+        row = self._connection.execute(
+            'SELECT value FROM settings WHERE key = ?', (key,)
+        ).fetchone()
+        return int(row[0]) if row else None
+
+    def _set_setting(self, key: str, value: Optional[int]) -> None:
+        if value is None:
+            self._connection.execute(
+                'DELETE FROM settings WHERE key = ?', (key,)
+            )
+        else:
+            self._connection.execute(
+                'INSERT OR REPLACE INTO settings VALUES (?, ?)',
+                (key, str(value))
+            )
+
+    def shard_count(self) -> Optional[int]:
+        """Действующее число шардов, заданное в реестре, или None."""
+        return self._setting('shard_count')
+
+    def shard_plan(self) -> ShardPlan:
+        """Возвращает действующее число шардов и перераспределение."""
+        return ShardPlan(
+            self._setting('shard_count'),
+            self._setting('pending_shard_count'),
+            self._setting('shard_epoch') or 0,
+        )
+
+    def set_shard_count(self, shards: Optional[int],
+                        force: bool = False) -> int:
+        """Начинает перераспределение на shards шардов.
+
+        None возвращает число из SHARD_COUNT. Новое число вступает
+        в силу после подтверждения всеми обработчиками (ack_rebalance),
+        а с force — сразу, даже если обработчики ещё работают по старому.
+        Возвращает эпоху перераспределения.
+        """
+        with self._connection:
+            epoch = (self._setting('shard_epoch') or 0) + 1
+            self._set_setting('shard_epoch', epoch)
+            if force:
+                self._set_setting('shard_count', shards)
+                self._set_setting('pending_shard_count', None)
+            else:
+                self._set_setting('pending_shard_count', shards or 0)
+        return epoch
+
+    def ack_rebalance(self, shard: int, epoch: int, shards: int) -> bool:
+        """Подтверждает, что шард shard увидел перераспределение epoch.
+
+        Когда эпоху подтвердили все шарды 0..shards - 1, новое число
+        шардов становится действующим. Возвращает True, если
+        перераспределение завершено.
+        """
+        with self._connection:
+            self._connection.execute(
+                'INSERT OR REPLACE INTO shard_acks VALUES (?, ?)',
+                (shard, epoch)
+            )
+            plan = self.shard_plan()
+            if plan.pending is None or plan.epoch != epoch:
+                return plan.epoch == epoch
+            (acked,) = self._connection.execute(
+                'SELECT COUNT(*) FROM shard_acks'
+                ' WHERE epoch = ? AND shard < ?', (epoch, shards)
+            ).fetchone()
+            if acked < shards:
+                return False
+            self._set_setting('shard_count', plan.pending or None)
+            self._set_setting('pending_shard_count', None)
+        return True
+
+    def acked_shards(self, epoch: int) -> List[int]:
+        """Шарды, подтвердившие перераспределение epoch."""
+        rows = self._connection.execute(
+            'SELECT shard FROM shard_acks WHERE epoch = ? ORDER BY shard',
+            (epoch,)
+        )
+        return [shard for (shard,) in rows]
+
+    def __iter__(self) -> Iterator[Subscriber]:
+        return iter(self.all())
+
+    def __len__(self) -> int:
+        (count,) = self._connection.execute(
+            'SELECT COUNT(*) FROM subscribers'
+        ).fetchone()
+        return count
+
+    def close(self) -> None:
+        """Закрывает соединение с базой."""
+        self._connection.close()
+
+
+def print_shard_plan(registry: SubscriberRegistry) -> None:
+    """Выводит число шардов и ход перераспределения."""
+    plan = registry.shard_plan()
+    print(plan.current or 'не задано, берётся SHARD_COUNT')
+    if plan.pending is not None:
+        acked = ', '.join(map(str, registry.acked_shards(plan.epoch)))
+        print(f'перераспределение на {plan.pending or "SHARD_COUNT"}, '
+              f'подтвердили шарды: {acked or "нет"}')
+
+
+def run_cli() -> None:
+    """Управление реестром подписчиков из командной строки."""
+    parser = argparse.ArgumentParser(description='Реестр подписчиков бота.')
+    parser.add_argument('db', help='путь к базе SQLite')
+    commands = parser.add_subparsers(dest='command', required=True)
+    add_parser = commands.add_parser('add', help='добавить подписчика')
+    add_parser.add_argument('sub_id')
+    add_parser.add_argument('practicum_token')
+    add_parser.add_argument('chat_id')
+    remove_parser = commands.add_parser('remove', help='удалить подписчика')
+    remove_parser.add_argument('sub_id')
+    commands.add_parser('list', help='показать подписчиков')
+    shards_parser = commands.add_parser(
+        'shards', help='показать или задать число шардов'
+    )
+    shards_parser.add_argument('count', nargs='?', type=int)
+    shards_parser.add_argument('--reset', action='store_true',
+                               help='брать число шардов из SHARD_COUNT')
+    shards_parser.add_argument('--force', action='store_true',
+                               help='не ждать подтверждения обработчиков')
+    args = parser.parse_args()
+    registry = SubscriberRegistry(args.db)
+    if args.command == 'add':
+        registry.add(args.sub_id, args.practicum_token, args.chat_id)
+    elif args.command == 'remove':
+        registry.remove(args.sub_id)
+    elif args.command == 'shards':
+        if args.reset or args.count is not None:
+            registry.set_shard_count(args.count, force=args.force)
+        print_shard_plan(registry)
+    else:
+        for subscriber in registry:
+            print(subscriber.sub_id, subscriber.chat_id)
+    registry.close()
+
+
+if __name__ == '__main__':
+    run_cli()
@@ -0,0 +1,53 @@
+"""Отправитель событий об изменении статуса работ для приёмника бота.
+
+    python tests/event_emitter.py http://127.0.0.1:8082/events \
+        --name hw.zip --status approved
+"""
+import argparse
+from datetime import datetime, timezone
+import json
+from typing import Optional
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+
+def emit(url: str, homeworks: list, secret: Optional[str] = None) -> tuple:
+    """Отправляет работы на приёмник и возвращает код и тело ответа."""
+    headers = {'Content-Type': 'application/json'}
+    if secret is not None:
+        headers['X-Webhook-Secret'] = secret
+    request = Request(
+        url, data=json.dumps({'homeworks': homeworks}).encode(),
+        headers=headers, method='POST'
+    )
+    try:
+        with urlopen(request, timeout=10) as response:
+            return response.status, json.loads(response.read())
+    except HTTPError as error:
+        return error.code, json.loads(error.read())
+
+
+def run_cli() -> None:
+    """Отправляет событие из командной строки."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('url')
+    parser.add_argument('--id', type=int, default=1)
+    parser.add_argument('--name', default='homework.zip')
+    parser.add_argument('--status', default='approved')
+    parser.add_argument('--comment', default='')
+    parser.add_argument('--secret')
+    args = parser.parse_args()
+    homework = {
+        'id': args.id,
+        'homework_name': args.name,
+        'status': args.status,
+        'reviewer_comment': args.comment,
+        'date_updated': datetime.now(timezone.utc).strftime(
+            '%Y-%m-%dT%H:%M:%SZ'
+        ),
+    }
+    print(*emit(args.url, [homework], args.secret))
+
+
+if __name__ == '__main__':
+    run_cli()
@@ -0,0 +1,224 @@
+"""Локальная замена API Yandex Practicum для нагрузочных и интеграционных
+тестов.
+
+Запуск отдельным процессом:
+
+    python tests/fake_practicum.py --port 8080 --students 1000 --latency 0.05
+
+после чего бот направляется на сервер переменной окружения
+PRACTICUM_ENDPOINT=http://127.0.0.1:8080/api/user_api/homework_statuses/
+"""
+import argparse
+from datetime import datetime, timezone
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import random
+import threading
+import time
+from urllib.parse import parse_qs, urlsplit
+
+API_PATH = '/api/user_api/homework_statuses/'
+STATUSES = ('reviewing', 'approved', 'rejected')
+
+
+class FakeServer(ThreadingHTTPServer):
+    """HTTP-сервер с длинной очередью соединений для нагрузочных тестов."""
+
+    request_queue_size = 1024
+    daemon_threads = True
+
+
+def to_iso(timestamp: float) -> str:
+    """Переводит timestamp в формат даты API."""
+    return datetime.fromtimestamp(timestamp, timezone.utc).strftime(
+        '%Y-%m-%dT%H:%M:%SZ'
+    )
+
+
+def from_iso(value: str) -> int:
+    """Переводит дату API в timestamp."""
+    return int(
+        datetime.strptime(value, '%Y-%m-%dT%H:%M:%SZ')
+        .replace(tzinfo=timezone.utc).timestamp()
+    )
+
+
+class FakePracticumAPI:
+    """Имитация эндпоинта homework_statuses/.
+
+    Работы хранятся по токенам и отдаются с фильтрацией по from_date.
+    Поддерживаются задержка ответа, доля случайных ошибок 500 и серии
+    ответов 5xx подряд.
+    """
+
+    def __init__(self, latency: float = 0.0, error_rate: float = 0.0,
+                 seed=None) -> None:
+        self.latency = latency
+        self.error_rate = error_rate
+        self.homeworks = {}
+        self.requests_count = 0
+        self._burst = []
+        self._next_id = 1
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = None
+
+    def add_homework(self, token: str, homework_name: str,
+                     status: str = 'reviewing',
+                     updated_at: float = None) -> dict:
+        """Добавляет работу студенту с токеном token."""
+        with self._lock:
+            homework = {
+                'id': self._next_id,
+                'status': status,
+                'homework_name': homework_name,
+                'reviewer_comment': '',
+                'date_updated': to_iso(
+                    time.time() if updated_at is None else updated_at
+                ),
+                'lesson_name': homework_name,
+            }
+            self._next_id += 1
+            self.homeworks.setdefault(token, []).append(homework)
+        return homework
+
+    def set_status(self, homework: dict, status: str,
+                   updated_at: float = None) -> None:
+        """Меняет статус работы и дату её обновления."""
+        with self._lock:
+            homework['status'] = status
+            homework['date_updated'] = to_iso(
+                time.time() if updated_at is None else updated_at
+            )
+
+    def populate(self, students: int, homeworks_per_student: int = 3,
+                 since: float = 0) -> list:
+        """Создаёт студентов token-N со случайными работами."""
+        tokens = [f'token-{number}' for number in range(students)]
+        now = time.time()
+        for token in tokens:
+            for number in range(homeworks_per_student):
+                self.add_homework(
+                    token, f'hw{number}', self._random.choice(STATUSES),
+                    self._random.uniform(since, now)
+                )
+        return tokens
+
+    def burst(self, count: int,
+              status: HTTPStatus = HTTPStatus.SERVICE_UNAVAILABLE) -> None:
+        """Следующие count ответов вернут код status."""
+        with self._lock:
+            self._burst.extend([status] * count)
+
+    def respond(self, authorization: str, query: dict) -> tuple:
+        """Возвращает код и тело ответа на запрос."""
+        with self._lock:
+            self.requests_count += 1
+            if self._burst:
+                return self._burst.pop(0), {'message': 'Сервис недоступен'}
+        if self.latency:
+            time.sleep(self.latency)
+        if self.error_rate and self._random.random() < self.error_rate:
+            return HTTPStatus.INTERNAL_SERVER_ERROR, {}
+        token = authorization.partition('OAuth ')[2]
+        if token not in self.homeworks:
+            return HTTPStatus.UNAUTHORIZED, {
+                'code': 'not_authenticated',
+                'message': 'Учетные данные не были предоставлены.',
+                'source': '__response__',
+            }
+        try:
+            from_date = int(query['from_date'][0])
+        except (KeyError, ValueError):
+            return HTTPStatus.BAD_REQUEST, {
+                'code': 'UnknownError',
+                'error': {'error': 'Wrong from_date format'},
+            }
+        with self._lock:
+            homeworks = [
+                dict(homework) for homework in self.homeworks[token]
+                if from_iso(homework['date_updated']) >= from_date
+            ]
+        homeworks.sort(key=lambda item: item['date_updated'], reverse=True)
+        return HTTPStatus.OK, {
+            'homeworks': homeworks,
+            'current_date': int(time.time()),
+        }
+
+    def start(self, host: str = '127.0.0.1',
+              port: int = 0) -> FakeServer:
+        """Запускает сервер в фоновом потоке."""
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                url = urlsplit(self.path)
+                if url.path != API_PATH:
+                    status, payload = HTTPStatus.NOT_FOUND, {}
+                else:
+                    status, payload = api.respond(
+                        self.headers.get('Authorization', ''),
+                        parse_qs(url.query)
+                    )
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = FakeServer((host, port), Handler)
+        threading.Thread(
+            target=self._server.serve_forever, daemon=True
+        ).start()
+        return self._server
+
+    @property
+    def url(self) -> str:
+        """Адрес эндпоинта запущенного сервера."""
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}{API_PATH}'
+
+    def stop(self) -> None:
+        """Останавливает сервер."""
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def run_cli() -> None:
+    """Запускает сервер из командной строки."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--students', type=int, default=100)
+    parser.add_argument('--homeworks', type=int, default=3)
+    parser.add_argument('--latency', type=float, default=0.0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--seed', type=int)
+    args = parser.parse_args()
+    api = FakePracticumAPI(args.latency, args.error_rate, args.seed)
+    api.populate(args.students, args.homeworks)
+    api.start(args.host, args.port)
+    print(f'{api.url} — токены token-0..token-{args.students - 1}')
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        api.stop()
+
+
+if __name__ == '__main__':
+    run_cli()
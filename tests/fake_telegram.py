@@ -0,0 +1,201 @@
+"""Локальная замена Telegram Bot API с эмуляцией ограничений частоты.
+
+Запуск отдельным процессом:
+
+    python tests/fake_telegram.py --port 8081 --global-rate 30 --chat-rate 1
+
+после чего бот направляется на сервер переменной окружения
+TELEGRAM_API_URL=http://127.0.0.1:8081/bot
+"""
+import argparse
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import math
+import threading
+import time
+
+
+class FakeServer(ThreadingHTTPServer):
+    """HTTP-сервер с длинной очередью соединений для нагрузочных тестов."""
+
+    request_queue_size = 1024
+    daemon_threads = True
+
+
+class RateWindow:
+    """Ограничитель частоты в духе Telegram: rate сообщений в секунду
+    с допустимой пачкой burst."""
+
+    def __init__(self, rate: float, burst: int) -> None:
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+
+    def retry_after(self, now: float) -> float:
+        """Возвращает 0, если отправка разрешена, иначе паузу в секундах."""
+        elapsed = max(now - self.updated, 0)
+        self.tokens = min(self.burst, self.tokens + elapsed * self.rate)
+        self.updated = max(now, self.updated)
+        if self.tokens >= 1:
+            return 0
+        return (1 - self.tokens) / self.rate
+
+    def take(self) -> None:
+        """Расходует одну отправку."""
+        self.tokens -= 1
+
+
+class FakeTelegramAPI:
+    """Имитация методов Bot API, которыми пользуется бот.
+
+    sendMessage принимается, пока не превышены общий лимит и лимит
+    на чат; иначе возвращается ответ 429 с parameters.retry_after,
+    который python-telegram-bot превращает в RetryAfter.
+    """
+
+    def __init__(self, global_rate: float = 30, chat_rate: float = 1,
+                 chat_burst: int = 1, latency: float = 0.0) -> None:
+        self.global_rate = global_rate
+        self.chat_rate = chat_rate
+        self.chat_burst = chat_burst
+        self.latency = latency
+        self.messages = []
+        self.rejected = 0
+        self._global = RateWindow(global_rate, max(int(global_rate), 1))
+        self._chats = {}
+        self._lock = threading.Lock()
+        self._server = None
+
+    def send_message(self, payload: dict) -> tuple:
+        """Обрабатывает sendMessage и возвращает код и тело ответа."""
+        if self.latency:
+            time.sleep(self.latency)
+        chat_id = payload.get('chat_id')
+        text = payload.get('text')
+        if chat_id is None or not text:
+            return HTTPStatus.BAD_REQUEST, {
+                'ok': False, 'error_code': 400,
+                'description': 'Bad Request: message text is empty',
+            }
+        with self._lock:
+            now = time.monotonic()
+            chat = self._chats.setdefault(
+                str(chat_id), RateWindow(self.chat_rate, self.chat_burst)
+            )
+            retry_after = max(
+                self._global.retry_after(now), chat.retry_after(now)
+            )
+            if retry_after:
+                self.rejected += 1
+                seconds = math.ceil(retry_after)
+                return HTTPStatus.TOO_MANY_REQUESTS, {
+                    'ok': False, 'error_code': 429,
+                    'description': (
+                        f'Too Many Requests: retry after {seconds}'
+                    ),
+                    'parameters': {'retry_after': seconds},
+                }
+            self._global.take()
+            chat.take()
+            message = {
+                'message_id': len(self.messages) + 1,
+                'date': int(time.time()),
+                'chat': {'id': int(chat_id), 'type': 'private'},
+                'text': text,
+            }
+            self.messages.append(message)
+        return HTTPStatus.OK, {'ok': True, 'result': message}
+
+    def respond(self, method: str, payload: dict) -> tuple:
+        """Возвращает код и тело ответа на вызов метода Bot API."""
+        if method == 'sendMessage':
+            return self.send_message(payload)
+        if method == 'getMe':
+            return HTTPStatus.OK, {'ok': True, 'result': {
+                'id': 1, 'is_bot': True, 'first_name': 'homework',
+                'username': 'homework_bot',
+            }}
+        return HTTPStatus.NOT_FOUND, {
+            'ok': False, 'error_code': 404, 'description': 'Not Found',
+        }
+
+    def start(self, host: str = '127.0.0.1', port: int = 0) -> FakeServer:
+        """Запускает сервер в фоновом потоке."""
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length', 0))
+                raw = self.rfile.read(length) if length else b'{}'
+                try:
+                    payload = json.loads(raw)
+                except ValueError:
+                    payload = {}
+                method = self.path.rstrip('/').rsplit('/', 1)[-1]
+                status, body = api.respond(method, payload)
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            do_GET = do_POST
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = FakeServer((host, port), Handler)
+        threading.Thread(
+            target=self._server.serve_forever, daemon=True
+        ).start()
+        return self._server
+
+    @property
+    def base_url(self) -> str:
+        """Значение base_url для telegram.Bot."""
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}/bot'
+
+    def stop(self) -> None:
+        """Останавливает сервер."""
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def run_cli() -> None:
+    """Запускает сервер из командной строки."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8081)
+    parser.add_argument('--global-rate', type=float, default=30)
+    parser.add_argument('--chat-rate', type=float, default=1)
+    parser.add_argument('--chat-burst', type=int, default=1)
+    parser.add_argument('--latency', type=float, default=0.0)
+    args = parser.parse_args()
+    api = FakeTelegramAPI(
+        args.global_rate, args.chat_rate, args.chat_burst, args.latency
+    )
+    api.start(args.host, args.port)
+    print(api.base_url)
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        print(f'Принято: {len(api.messages)}, отклонено: {api.rejected}')
+        api.stop()
+
+
+if __name__ == '__main__':
+    run_cli()
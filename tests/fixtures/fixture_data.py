@@ -29,3 +29,38 @@ def random_message():
         letters = string.ascii_letters
         return ''.join(random.choice(letters) for _ in range(string_length))
     return random_string()
+
+
+@pytest.fixture
+def fake_practicum():
+    from fake_practicum import FakePracticumAPI
+    with FakePracticumAPI() as api:
+        yield api
+
+
+@pytest.fixture
+def fake_practicum_client(monkeypatch, fake_practicum, homework_module):
+    from api_client import PracticumClient
+    from resilience import CircuitBreaker
+    client = PracticumClient(
+        fake_practicum.url, homework_module.HEADERS, pool_size=4,
+        breaker=CircuitBreaker(failure_threshold=3, reset_timeout=60)
+    )
+    monkeypatch.setattr(homework_module, 'api_client', client)
+    yield client
+    client.close()
+
+
+@pytest.fixture
+def fake_telegram():
+    from fake_telegram import FakeTelegramAPI
+    with FakeTelegramAPI(global_rate=30, chat_rate=1) as api:
+        yield api
+
+
+@pytest.fixture
+def fake_telegram_bot(fake_telegram):
+    import telegram
+    return telegram.Bot(
+        token='1234:abcdefg', base_url=fake_telegram.base_url
+    )
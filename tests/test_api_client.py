@@ -0,0 +1,211 @@
+from http import HTTPStatus
+import time
+
+import pytest
+import requests
+
+import utils
+
+
+class TestPracticumClient:
+    ENDPOINT = 'https://practicum.yandex.ru/api/user_api/homework_statuses/'
+    HEADERS = {'Authorization': 'OAuth token'}
+
+    def test_without_pool_uses_requests_get(self, monkeypatch,
+                                            random_timestamp):
+        from api_client import PracticumClient
+
+        calls = []
+
+        def mock_response_get(url, **kwargs):
+            calls.append((url, kwargs))
+            return utils.MockResponseGET(random_timestamp=random_timestamp)
+
+        monkeypatch.setattr(requests, 'get', mock_response_get)
+        client = PracticumClient(self.ENDPOINT, self.HEADERS)
+        client.get(params={'from_date': random_timestamp})
+        assert calls == [(
+            self.ENDPOINT,
+            {
+                'headers': self.HEADERS,
+                'params': {'from_date': random_timestamp},
+                'timeout': (5.0, 30.0),
+            }
+        )], 'Без пула клиент должен выполнять запрос через `requests.get`.'
+
+    def test_pool_reuses_session(self, monkeypatch):
+        from api_client import PracticumClient
+
+        client = PracticumClient(
+            self.ENDPOINT, self.HEADERS, pool_size=8,
+            connect_timeout=2, read_timeout=10
+        )
+        assert isinstance(client.session, requests.Session), (
+            'С пулом соединений клиент должен использовать `requests.Session`.'
+        )
+        adapter = client.session.get_adapter(self.ENDPOINT)
+        assert adapter._pool_maxsize == 8
+
+        sent = []
+
+        def mock_session_get(url, **kwargs):
+            sent.append(kwargs)
+            return utils.MockResponseGET()
+
+        monkeypatch.setattr(client.session, 'get', mock_session_get)
+        client.get(params={}, headers={'Authorization': 'OAuth other'})
+        assert sent[0]['timeout'] == (2, 10)
+        assert sent[0]['headers'] == {'Authorization': 'OAuth other'}
+        client.close()
+
+    def test_read_timeout_limited_by_deadline(self):
+        from api_client import PracticumClient
+
+        client = PracticumClient(self.ENDPOINT, self.HEADERS)
+        connect_timeout, read_timeout = client.timeout(
+            deadline=time.monotonic() + 3
+        )
+        assert connect_timeout == 5.0
+        assert 0 < read_timeout <= 3, (
+            'Таймаут чтения не должен выходить за дедлайн цикла.'
+        )
+
+    def test_expired_deadline_is_not_a_failure(self, monkeypatch):
+        from api_client import PracticumClient
+        from exceptions import CycleDeadlineExceeded
+        from resilience import CircuitBreaker
+
+        def mock_response_get(url, timeout=None, **kwargs):
+            time.sleep(timeout[1])
+            raise requests.ReadTimeout('Read timed out')
+
+        monkeypatch.setattr(requests, 'get', mock_response_get)
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+        client = PracticumClient(self.ENDPOINT, self.HEADERS, breaker=breaker)
+        with pytest.raises(CycleDeadlineExceeded):
+            client.get(params={}, deadline=time.monotonic() - 1)
+        with pytest.raises(CycleDeadlineExceeded):
+            client.get(params={}, deadline=time.monotonic() + 0.01)
+        assert breaker.state == breaker.CLOSED, (
+            'Исчерпание бюджета цикла не должно размыкать цепь.'
+        )
+
+        breaker.record_failure()
+        assert breaker.state == breaker.OPEN
+        with pytest.raises(CycleDeadlineExceeded):
+            client.get(params={}, deadline=time.monotonic() + 0.01)
+        assert breaker.allow(), (
+            'Пробный запрос, прерванный дедлайном, должен повториться.'
+        )
+
+    def test_breaker_rejects_after_server_failures(self, monkeypatch):
+        from api_client import PracticumClient
+        from exceptions import CircuitOpenError
+        from resilience import CircuitBreaker
+
+        calls = []
+
+        def mock_response_get(url, **kwargs):
+            calls.append(url)
+            return utils.MockResponseGET(
+                http_status=HTTPStatus.SERVICE_UNAVAILABLE
+            )
+
+        monkeypatch.setattr(requests, 'get', mock_response_get)
+        breaker = CircuitBreaker(failure_threshold=3, reset_timeout=60)
+        client = PracticumClient(self.ENDPOINT, self.HEADERS, breaker=breaker)
+        for _ in range(3):
+            client.get(params={})
+        assert breaker.state == breaker.OPEN
+        with pytest.raises(CircuitOpenError):
+            client.get(params={})
+        assert len(calls) == 3, (
+            'При разомкнутой цепи запросы к API не должны выполняться.'
+        )
+
+    def test_conditional_request_after_validators(self, monkeypatch):
+        from api_client import PracticumClient
+
+        sent = []
+
+        def mock_response_get(url, **kwargs):
+            sent.append(kwargs['headers'])
+            status = HTTPStatus.NOT_MODIFIED if len(sent) > 1 else None
+            response = utils.MockResponseGET(
+                http_status=status or HTTPStatus.OK
+            )
+            response.headers = {
+                'ETag': '"v1"',
+                'Last-Modified': 'Mon, 01 Jan 2024 00:00:00 GMT',
+            }
+            return response
+
+        monkeypatch.setattr(requests, 'get', mock_response_get)
+        client = PracticumClient(self.ENDPOINT, self.HEADERS)
+        client.get(params={'from_date': 1})
+        response = client.get(params={'from_date': 1})
+        assert sent[0] == self.HEADERS
+        assert sent[1] == {
+            **self.HEADERS,
+            'If-None-Match': '"v1"',
+            'If-Modified-Since': 'Mon, 01 Jan 2024 00:00:00 GMT',
+        }, 'Повторный запрос должен передавать валидаторы прошлого ответа.'
+        assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+        client.get(params={'from_date': 2})
+        assert sent[2] == self.HEADERS, (
+            'Валидаторы не должны передаваться с другими параметрами запроса.'
+        )
+
+    def test_not_modified_skips_decoding(self, monkeypatch, homework_module):
+        from subscribers import ENV_SUBSCRIBER, SubscriberState
+
+        def mock_response_get(url, **kwargs):
+            response = utils.MockResponseGET(
+                http_status=HTTPStatus.NOT_MODIFIED
+            )
+            response.json = pytest.fail
+            return response
+
+        def fail_check_response(response):
+            pytest.fail('При ответе 304 ответ API не должен проверяться.')
+
+        monkeypatch.setattr(requests, 'get', mock_response_get)
+        monkeypatch.setattr(homework_module, 'api_client', None)
+        monkeypatch.setattr(
+            homework_module, 'check_response', fail_check_response
+        )
+        state = SubscriberState(timestamp=0)
+        homework_module.poll_subscriber(
+            utils.MockTelegramBot(), ENV_SUBSCRIBER, state
+        )
+        assert state.failures == 0 and state.next_poll > 0, (
+            'Ответ 304 не является ошибкой и не откладывает опрос.'
+        )
+
+    def test_legacy_answer_is_never_empty(self, monkeypatch,
+                                          random_timestamp, homework_module):
+        sent = []
+
+        def mock_response_get(url, **kwargs):
+            sent.append(kwargs['headers'])
+            status = HTTPStatus.OK
+            if 'If-None-Match' in kwargs['headers']:
+                status = HTTPStatus.NOT_MODIFIED
+            response = utils.MockResponseGET(
+                random_timestamp=random_timestamp, http_status=status
+            )
+            response.headers = {'ETag': '"v1"'}
+            return response
+
+        monkeypatch.setattr(requests, 'get', mock_response_get)
+        monkeypatch.setattr(homework_module, 'api_client', None)
+        homework_module.get_api_answer(random_timestamp)
+        response = homework_module.get_api_answer(random_timestamp)
+        assert homework_module.check_response(response) == [], (
+            '`get_api_answer` должна возвращать тело ответа и при повторном '
+            'запросе.'
+        )
+        assert sent == [homework_module.HEADERS] * 2, (
+            '`get_api_answer` не должна отправлять условные заголовки.'
+        )
@@ -0,0 +1,91 @@
+import asyncio
+import time
+
+import requests
+
+import utils
+
+
+class TestAsyncMode:
+    SUBSCRIBERS_QTY = 8
+    API_LATENCY = 0.2
+
+    def test_polls_overlap(self, monkeypatch, random_timestamp,
+                           homework_module):
+        import subscribers
+
+        def slow_response_get(*args, **kwargs):
+            time.sleep(self.API_LATENCY)
+            response = utils.MockResponseGET(
+                *args, random_timestamp=random_timestamp, **kwargs
+            )
+            response.json = lambda: {
+                'homeworks': [{'homework_name': 'hw1', 'status': 'approved'}],
+                'current_date': random_timestamp
+            }
+            return response
+
+        monkeypatch.setattr(requests, 'get', slow_response_get)
+        bot = utils.MockTelegramBot()
+        chats = [str(number) for number in range(self.SUBSCRIBERS_QTY)]
+        subscriber_list = [
+            subscribers.Subscriber(chat, 'token', chat) for chat in chats
+        ]
+        states = homework_module.sync_states({}, subscriber_list)
+
+        started = time.monotonic()
+        asyncio.run(homework_module.async_poll_cycle(
+            asyncio.Semaphore(self.SUBSCRIBERS_QTY), bot,
+            subscriber_list, states
+        ))
+        elapsed = time.monotonic() - started
+
+        assert elapsed < self.API_LATENCY * self.SUBSCRIBERS_QTY / 2, (
+            'В асинхронном режиме запросы к API должны выполняться '
+            'одновременно.'
+        )
+        assert all(
+            state.timestamp == random_timestamp for state in states.values()
+        )
+
+    def test_budget_exhaustion_skips_waiting_polls(
+            self, monkeypatch, random_timestamp, homework_module
+    ):
+        import subscribers
+
+        def slow_response_get(*args, timeout=None, **kwargs):
+            if timeout[1] < self.API_LATENCY:
+                time.sleep(timeout[1])
+                raise requests.ReadTimeout('Read timed out')
+            time.sleep(self.API_LATENCY)
+            return utils.MockResponseGET(
+                *args, random_timestamp=random_timestamp, **kwargs
+            )
+
+        monkeypatch.setattr(requests, 'get', slow_response_get)
+        monkeypatch.setattr(homework_module, 'api_client', None)
+        monkeypatch.setattr(homework_module, 'CYCLE_DEADLINE', 0.5)
+        subscriber_list = [
+            subscribers.Subscriber(str(number), 'token', str(number))
+            for number in range(self.SUBSCRIBERS_QTY)
+        ]
+        states = homework_module.sync_states({}, subscriber_list)
+
+        asyncio.run(homework_module.async_poll_cycle(
+            asyncio.Semaphore(2), utils.MockTelegramBot(),
+            subscriber_list, states
+        ))
+
+        assert all(state.failures == 0 for state in states.values()), (
+            'Исчерпание бюджета цикла не должно считаться сбоем API.'
+        )
+        assert homework_module.api_client.breaker.failures == 0
+        assert homework_module.api_client.breaker.state == 'closed'
+        now = time.monotonic()
+        skipped = [
+            state for state in states.values() if state.next_poll <= now
+        ]
+        assert 0 < len(skipped) < self.SUBSCRIBERS_QTY, (
+            'Опросы, не успевшие до дедлайна, должны остаться в очереди '
+            'до следующего цикла.'
+        )
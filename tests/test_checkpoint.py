@@ -0,0 +1,32 @@
+class TestCheckpointStore:
+
+    def test_restart_restores_state(self, tmp_path, random_timestamp,
+                                    homework_module):
+        from checkpoint import CheckpointStore
+        from subscribers import SubscriberState
+
+        path = str(tmp_path / 'checkpoint.db')
+        response = {
+            'homeworks': [
+                {'id': 7, 'homework_name': 'hw7', 'status': 'reviewing'}
+            ],
+            'current_date': random_timestamp
+        }
+        store = CheckpointStore(path)
+        state = SubscriberState(timestamp=0)
+        homework_module.process_response(state, response)
+        assert store.save({'student': state}) == 1
+        assert store.save({'student': state}) == 0, (
+            'Неизменившееся состояние не нужно сохранять повторно.'
+        )
+        store.close()
+
+        restored = CheckpointStore(path).load_all()
+        assert restored['student'].timestamp == random_timestamp, (
+            'После перезапуска опрос должен продолжаться с сохранённой даты.'
+        )
+        assert homework_module.process_response(
+            restored['student'], response
+        ) == [], (
+            'После перезапуска бот не должен повторять отправленные статусы.'
+        )
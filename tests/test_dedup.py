@@ -0,0 +1,57 @@
+import time
+
+
+class TestSeenCache:
+
+    def test_lru_eviction(self):
+        from dedup import SeenCache
+
+        cache = SeenCache(max_size=2)
+        cache.add('a')
+        cache.add('b')
+        assert cache.seen('a')
+        cache.add('c')
+        assert len(cache) == 2, 'Размер кэша не должен превышать max_size.'
+        assert cache.seen('a') and cache.seen('c')
+        assert not cache.seen('b'), (
+            'Вытесняться должен ключ, который дольше всего не встречался.'
+        )
+
+    def test_ttl_expiration(self):
+        from dedup import SeenCache
+
+        cache = SeenCache(ttl=60)
+        cache.add('old', seen_at=time.time() - 61)
+        cache.add('new')
+        assert not cache.seen('old'), 'Ключи старше TTL должны забываться.'
+        assert cache.seen('new')
+        assert len(cache) == 1
+
+    def test_same_status_with_new_date_is_notified(self, monkeypatch,
+                                                   homework_module):
+        from subscribers import SubscriberState
+
+        formatted = []
+        parse_status = homework_module.parse_status
+
+        def counting_parse_status(homework):
+            formatted.append(homework)
+            return parse_status(homework)
+
+        monkeypatch.setattr(
+            homework_module, 'parse_status', counting_parse_status
+        )
+        state = SubscriberState(timestamp=0)
+        homework = {
+            'id': 1, 'homework_name': 'hw1', 'status': 'rejected',
+            'date_updated': '2020-02-13T14:40:57Z'
+        }
+        assert homework_module.process_homework(state, homework)
+        assert homework_module.process_homework(state, homework) is None
+        assert len(formatted) == 1, (
+            'Сообщение о дубликате не должно форматироваться.'
+        )
+        homework['date_updated'] = '2020-02-14T10:00:00Z'
+        assert homework_module.process_homework(state, homework), (
+            'Повторный вердикт с новой датой обновления нужно отправить.'
+        )
@@ -0,0 +1,88 @@
+import time
+
+import pytest
+
+import utils
+
+
+class TestFakePracticumIntegration:
+
+    def test_poll_real_http(self, fake_practicum, fake_practicum_client,
+                            homework_module):
+        from subscribers import Subscriber, SubscriberState
+
+        started = time.time()
+        homework = fake_practicum.add_homework('alice', 'hw1', 'reviewing')
+        fake_practicum.add_homework('bob', 'hw2', 'approved')
+        bot = utils.MockTelegramBot()
+        subscriber = Subscriber('alice', 'alice', '1')
+        state = SubscriberState(timestamp=int(started) - 1)
+
+        homework_module.poll_subscriber(bot, subscriber, state)
+        assert '"hw1"' in bot.text and 'на проверку' in bot.text, (
+            'Бот должен получить работу студента по его токену.'
+        )
+
+        bot.text = None
+        homework_module.poll_subscriber(bot, subscriber, state)
+        assert bot.text is None, (
+            'Работы, не менявшиеся после from_date, не должны приходить.'
+        )
+
+        fake_practicum.set_status(homework, 'approved', time.time() + 1)
+        homework_module.poll_subscriber(bot, subscriber, state)
+        assert 'понравилось' in bot.text
+
+    def test_server_errors_open_breaker(self, fake_practicum,
+                                        fake_practicum_client,
+                                        homework_module):
+        from subscribers import Subscriber, SubscriberState
+
+        fake_practicum.add_homework('alice', 'hw1')
+        fake_practicum.burst(5)
+        bot = utils.MockTelegramBot()
+        subscriber = Subscriber('alice', 'alice', '1')
+        state = SubscriberState(timestamp=0)
+        for _ in range(5):
+            homework_module.poll_subscriber(bot, subscriber, state)
+        assert fake_practicum.requests_count == 3, (
+            'После серии ответов 5xx запросы к API должны приостанавливаться.'
+        )
+        assert state.failures == 5
+        assert fake_practicum_client.breaker.state == 'open'
+
+    def test_unknown_token(self, fake_practicum, fake_practicum_client,
+                           homework_module):
+        from subscribers import Subscriber, SubscriberState
+
+        state = SubscriberState(timestamp=0)
+        homework_module.poll_subscriber(
+            utils.MockTelegramBot(), Subscriber('eve', 'eve', '1'), state
+        )
+        assert state.failures == 1
+        assert fake_practicum_client.breaker.state == 'closed', (
+            'Ответ 401 для одного токена не должен размыкать цепь.'
+        )
+
+
+class TestFakeTelegramIntegration:
+
+    def test_send_through_bot_api(self, fake_telegram, fake_telegram_bot,
+                                  homework_module):
+        homework_module.send_chat_message(fake_telegram_bot, '42', 'Привет')
+        assert fake_telegram.messages[0]['text'] == 'Привет'
+        assert fake_telegram.messages[0]['chat']['id'] == 42
+
+    def test_chat_flood_limit_raises_retry_after(self, fake_telegram,
+                                                 fake_telegram_bot):
+        import telegram
+
+        fake_telegram_bot.send_message(chat_id=1, text='первое')
+        with pytest.raises(telegram.error.RetryAfter) as error:
+            fake_telegram_bot.send_message(chat_id=1, text='второе')
+        assert error.value.retry_after >= 1, (
+            'Заглушка Telegram должна сообщать, через сколько повторить.'
+        )
+        fake_telegram_bot.send_message(chat_id=2, text='другой чат')
+        assert len(fake_telegram.messages) == 2
+        assert fake_telegram.rejected == 1
@@ -0,0 +1,98 @@
+import asyncio
+import json
+import logging
+
+import requests
+
+import utils
+
+
+class TestJsonFormatter:
+
+    def test_format_with_context_and_extra(self):
+        from jsonlog import (CYCLE_ID, ContextFilter, JsonFormatter,
+                             SUBSCRIBER_ID)
+
+        record = logging.LogRecord(
+            'homework', logging.INFO, __file__, 1, 'Опрос %s', ('42',), None
+        )
+        record.outcome = 'ok'
+        record.duration = 0.25
+        cycle_token = CYCLE_ID.set('cycle')
+        subscriber_token = SUBSCRIBER_ID.set('42')
+        try:
+            ContextFilter().filter(record)
+        finally:
+            CYCLE_ID.reset(cycle_token)
+            SUBSCRIBER_ID.reset(subscriber_token)
+        data = json.loads(JsonFormatter().format(record))
+        assert data['message'] == 'Опрос 42'
+        assert data['level'] == 'INFO'
+        assert data['cycle_id'] == 'cycle'
+        assert data['subscriber_id'] == '42'
+        assert data['outcome'] == 'ok'
+        assert data['duration'] == 0.25
+        assert 'event' not in data, 'Пустые поля не должны выводиться.'
+
+
+class TestCorrelation:
+
+    def poll_records(self, caplog) -> list:
+        return [
+            record for record in caplog.records
+            if getattr(record, 'event', None) == 'poll'
+        ]
+
+    def test_poll_cycle_marks_records(self, monkeypatch, caplog,
+                                      random_timestamp, homework_module):
+        from jsonlog import ContextFilter
+        from subscribers import Subscriber
+
+        caplog.handler.addFilter(ContextFilter())
+        monkeypatch.setattr(
+            requests, 'get',
+            lambda *args, **kwargs: utils.MockResponseGET(
+                random_timestamp=random_timestamp
+            )
+        )
+        monkeypatch.setattr(homework_module, 'api_client', None)
+        subscribers = [Subscriber('1', 'token', '1'),
+                       Subscriber('2', 'token', '2')]
+        states = homework_module.sync_states({}, subscribers)
+        with caplog.at_level(logging.DEBUG):
+            homework_module.poll_cycle(
+                utils.MockTelegramBot(), subscribers, states
+            )
+        records = self.poll_records(caplog)
+        assert [record.subscriber_id for record in records] == ['1', '2']
+        assert {record.outcome for record in records} == {'ok'}
+        assert len({record.cycle_id for record in records}) == 1, (
+            'Записи одного цикла должны иметь общий идентификатор цикла.'
+        )
+        assert all(record.duration >= 0 for record in records)
+
+    def test_async_poll_keeps_context_in_threads(self, monkeypatch, caplog,
+                                                 homework_module):
+        from jsonlog import SUBSCRIBER_ID
+        from subscribers import Subscriber
+
+        seen = []
+
+        def mock_response_get(*args, **kwargs):
+            seen.append(SUBSCRIBER_ID.get())
+            return utils.MockResponseGET(http_status=500)
+
+        monkeypatch.setattr(requests, 'get', mock_response_get)
+        monkeypatch.setattr(homework_module, 'api_client', None)
+        subscribers = [Subscriber('7', 'token', '7')]
+        states = homework_module.sync_states({}, subscribers)
+        with caplog.at_level(logging.DEBUG):
+            asyncio.run(homework_module.async_poll_cycle(
+                asyncio.Semaphore(1), utils.MockTelegramBot(),
+                subscribers, states
+            ))
+        assert seen == ['7'], (
+            'Идентификатор подписчика должен передаваться в пул потоков.'
+        )
+        [record] = self.poll_records(caplog)
+        assert record.outcome == 'api_error'
@@ -0,0 +1,141 @@
+import time
+
+
+class TestLeaseLock:
+
+    def test_single_owner_and_release(self, tmp_path):
+        from leader import LeaseLock
+
+        path = str(tmp_path / 'lease.db')
+        first = LeaseLock(path, 'shard-0', ttl=30, owner='first')
+        second = LeaseLock(path, 'shard-0', ttl=30, owner='second')
+        assert first.acquire()
+        assert not second.acquire(), (
+            'Пока аренда действует, второй процесс не должен её получить.'
+        )
+        assert first.is_leader and not second.is_leader
+        assert LeaseLock(path, 'shard-1', owner='second').acquire(), (
+            'Аренды разных шардов независимы.'
+        )
+        first.release()
+        assert not first.is_leader
+        assert second.acquire()
+        assert second.term == 1
+
+    def test_expired_lease_is_taken_over(self, tmp_path):
+        from leader import LeaseLock
+
+        path = str(tmp_path / 'lease.db')
+        first = LeaseLock(path, 'shard-0', ttl=0.2, owner='first')
+        second = LeaseLock(path, 'shard-0', ttl=0.2, owner='second')
+        assert first.acquire()
+        time.sleep(0.3)
+        assert second.acquire(), 'Истёкшую аренду должен забрать резерв.'
+        assert not first.acquire()
+        assert not first.is_leader
+
+    def test_heartbeat_renews_lease(self, tmp_path):
+        from leader import LeaseLock
+
+        path = str(tmp_path / 'lease.db')
+        leader = LeaseLock(path, 'shard-0', ttl=0.3, owner='leader').start()
+        standby = LeaseLock(path, 'shard-0', ttl=0.3, owner='standby')
+        try:
+            time.sleep(0.8)
+            assert leader.is_leader, 'Аренда должна продлеваться в фоне.'
+            assert not standby.acquire()
+        finally:
+            leader.release()
+        assert standby.acquire()
+
+
+class TestStandby:
+
+    def test_takeover_reloads_states(self, monkeypatch, tmp_path,
+                                     random_timestamp, homework_module):
+        from checkpoint import CheckpointStore
+        from leader import LeaseLock
+        from subscribers import ENV_SUBSCRIBER
+
+        path = str(tmp_path / 'lease.db')
+        checkpoints = CheckpointStore(str(tmp_path / 'checkpoint.db'))
+        active = LeaseLock(path, 'shard-0', owner='active')
+        standby = LeaseLock(path, 'shard-0', owner='standby')
+        assert active.acquire()
+        standby.acquire()
+        monkeypatch.setattr(homework_module, 'lease', standby)
+        monkeypatch.setattr(homework_module, 'leader_term', 0)
+        states = homework_module.sync_states({}, [ENV_SUBSCRIBER])
+        assert not homework_module.is_active(checkpoints, states)
+        assert homework_module.next_delay(states) == standby.ttl / 3, (
+            'Резервный процесс должен проверять аренду чаще обычного.'
+        )
+
+        response = {
+            'homeworks': [
+                {'id': 1, 'homework_name': 'hw', 'status': 'approved'}
+            ],
+            'current_date': random_timestamp,
+        }
+        saved = homework_module.sync_states({}, [ENV_SUBSCRIBER])
+        homework_module.process_response(
+            saved[ENV_SUBSCRIBER.sub_id], response
+        )
+        checkpoints.save(saved)
+        active.release()
+        assert standby.acquire()
+        assert homework_module.is_active(checkpoints, states)
+        assert homework_module.process_response(
+            states[ENV_SUBSCRIBER.sub_id], response
+        ) == [], (
+            'Ставший активным процесс должен продолжить с состояния '
+            'прежнего владельца аренды.'
+        )
+        checkpoints.close()
+
+    def test_lost_lease_stops_cycle(self, monkeypatch, random_timestamp,
+                                    homework_module):
+        import requests
+
+        import utils
+        from subscribers import Subscriber
+
+        class ExpiringLease:
+            is_leader = True
+
+        lease = ExpiringLease()
+
+        def mock_response_get(*args, **kwargs):
+            response = utils.MockResponseGET(
+                *args, random_timestamp=random_timestamp, **kwargs
+            )
+            response.json = lambda: {
+                'homeworks': [{'homework_name': 'hw', 'status': 'approved'}],
+                'current_date': random_timestamp,
+            }
+            return response
+
+        class RecordingBot:
+            chats = []
+
+            def send_message(self, chat_id=None, text=None, **kwargs):
+                self.chats.append(chat_id)
+                lease.is_leader = False
+
+        monkeypatch.setattr(requests, 'get', mock_response_get)
+        monkeypatch.setattr(homework_module, 'api_client', None)
+        monkeypatch.setattr(homework_module, 'send_queue', None)
+        monkeypatch.setattr(homework_module, 'lease', lease)
+        subscribers = [
+            Subscriber(str(number), 'token', str(number))
+            for number in range(3)
+        ]
+        states = homework_module.sync_states({}, subscribers)
+        bot = RecordingBot()
+        homework_module.poll_cycle(bot, subscribers, states)
+        assert len(bot.chats) == 1, (
+            'Потеряв аренду посреди цикла, процесс не должен продолжать '
+            'опрос и отправку.'
+        )
+        assert sum(state.timestamp == random_timestamp
+                   for state in states.values()) == 1
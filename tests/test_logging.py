@@ -0,0 +1,64 @@
+import json
+import os
+import subprocess
+import sys
+
+from conftest import BASE_DIR
+
+WARN_SCRIPT = (
+    'import homework; '
+    'homework.setup_logging(); '
+    'homework.logger.debug("Отладка"); '
+    'homework.logger.warning("Проверка %s", "очереди")'
+)
+MODULE_SCRIPT = (
+    'import logging, homework, jsonlog; '
+    'homework.setup_logging(); '
+    'jsonlog.new_cycle_id(); '
+    'logging.getLogger("resilience").info("Цепь замкнута"); '
+    'logging.getLogger("urllib3").debug("Шум библиотеки")'
+)
+
+
+def run_homework(script: str, **env: str) -> str:
+    """Выполняет script в отдельном процессе и возвращает вывод в stderr."""
+    result = subprocess.run(
+        [sys.executable, '-c', script],
+        cwd=BASE_DIR, env={**os.environ, **env},
+        capture_output=True, text=True, timeout=60, check=True
+    )
+    return result.stderr
+
+
+class TestLogging:
+
+    def test_default_level_is_debug(self):
+        stderr = run_homework(WARN_SCRIPT)
+        assert 'Отладка' in stderr
+
+    def test_log_level_from_env(self):
+        stderr = run_homework(WARN_SCRIPT, LOG_LEVEL='warning')
+        assert 'Отладка' not in stderr, (
+            'При LOG_LEVEL=WARNING отладочные сообщения не должны выводиться.'
+        )
+        assert 'Проверка очереди' in stderr
+
+    def test_queue_handler_flushes_on_exit(self):
+        stderr = run_homework(WARN_SCRIPT, LOG_QUEUE='1')
+        assert 'Отладка' in stderr
+        assert 'Проверка очереди' in stderr, (
+            'Сообщения из очереди логов должны быть выведены '
+            'до завершения процесса.'
+        )
+
+    def test_module_loggers_share_format(self):
+        stderr = run_homework(MODULE_SCRIPT, LOG_FORMAT='json')
+        records = [json.loads(line) for line in stderr.splitlines()]
+        assert [record['message'] for record in records] == [
+            'Цепь замкнута'
+        ], (
+            'Записи других модулей бота должны выводиться в том же формате, '
+            'а отладка сторонних библиотек — нет.'
+        )
+        assert records[0]['logger'] == 'resilience'
+        assert records[0]['cycle_id']
@@ -0,0 +1,134 @@
+from http import HTTPStatus
+import time
+from urllib.request import urlopen
+
+import requests
+
+import utils
+
+
+class TestHistogram:
+
+    def test_quantiles(self):
+        from metrics import Histogram
+
+        histogram = Histogram('test_seconds', 'Тест.', buckets=(1, 2, 3, 4))
+        for value in (0.5,) * 50 + (1.5,) * 45 + (3.5,) * 5:
+            histogram.observe(value)
+        assert histogram.count == 100
+        assert 0 < histogram.quantile(0.5) <= 1
+        assert 1 < histogram.quantile(0.95) <= 2
+        assert 3 < histogram.quantile(0.99) <= 4
+
+    def test_render_prometheus_text(self):
+        from metrics import Histogram
+
+        histogram = Histogram('render_seconds', 'Тест.', buckets=(1, 2))
+        with histogram.time():
+            pass
+        text = histogram.render()
+        assert '# TYPE render_seconds histogram' in text
+        assert 'render_seconds_bucket{le="1"} 1' in text
+        assert 'render_seconds_bucket{le="+Inf"} 1' in text
+        assert 'render_seconds_count 1' in text
+        assert 'render_seconds_quantile{quantile="0.99"}' in text
+
+    def test_counter_with_labels(self):
+        from metrics import Counter
+
+        counter = Counter('errors_total', 'Тест.', labels=('error',))
+        counter.inc(error='Timeout')
+        counter.inc(2, error='Timeout')
+        counter.inc(error='ValueError')
+        assert counter.value(error='Timeout') == 3
+        text = counter.render()
+        assert '# TYPE errors_total counter' in text
+        assert 'errors_total{error="Timeout"} 3' in text
+        assert 'errors_total{error="ValueError"} 1' in text
+
+    def test_gauge_function(self):
+        from metrics import Gauge
+
+        gauge = Gauge('depth', 'Тест.')
+        gauge.set(5)
+        assert 'depth 5' in gauge.render()
+        items = [1, 2]
+        gauge.set_function(items.__len__)
+        items.append(3)
+        assert gauge.value == 3, (
+            'Значение с функцией должно вычисляться при каждом чтении.'
+        )
+
+    def test_metrics_server(self):
+        from metrics import API_LATENCY, start_metrics_server
+
+        server = start_metrics_server(0, host='127.0.0.1')
+        try:
+            url = f'http://127.0.0.1:{server.server_address[1]}/metrics'
+            with urlopen(url) as response:
+                body = response.read().decode()
+        finally:
+            server.shutdown()
+            server.server_close()
+        assert f'# TYPE {API_LATENCY.name} histogram' in body, (
+            'Сервер метрик должен отдавать гистограмму задержек API.'
+        )
+
+
+class TestBotMetrics:
+
+    def test_api_errors_counted_by_class(self, monkeypatch):
+        import homework
+        from metrics import API_FAILURES, POLLS
+        from subscribers import ENV_SUBSCRIBER, SubscriberState
+
+        def mock_response_get(*args, **kwargs):
+            return utils.MockResponseGET(
+                http_status=HTTPStatus.INTERNAL_SERVER_ERROR
+            )
+
+        monkeypatch.setattr(requests, 'get', mock_response_get)
+        monkeypatch.setattr(homework, 'api_client', None)
+        polls = POLLS.value()
+        errors = API_FAILURES.value(error='InvalidResponseCode')
+        homework.poll_subscriber(
+            utils.MockTelegramBot(), ENV_SUBSCRIBER,
+            SubscriberState(timestamp=0)
+        )
+        assert POLLS.value() == polls + 1
+        assert API_FAILURES.value(error='InvalidResponseCode') == errors + 1, (
+            'Ошибка API должна учитываться в счётчике по имени её класса.'
+        )
+
+    def test_messages_sent_counted(self):
+        import homework
+        from metrics import MESSAGES_SENT
+
+        sent = MESSAGES_SENT.value()
+        homework.send_chat_message(utils.MockTelegramBot(), '1', 'Привет')
+        assert MESSAGES_SENT.value() == sent + 1
+
+    def test_scheduler_lag_observed_for_due_subscribers(self):
+        import homework
+        from metrics import SCHEDULER_LAG
+        from subscribers import Subscriber, SubscriberState
+
+        now = time.monotonic()
+        subscribers = [
+            Subscriber('late', 'token', '1'),
+            Subscriber('early', 'token', '2'),
+            Subscriber('future', 'token', '3'),
+        ]
+        states = {
+            'late': SubscriberState(timestamp=0, next_poll=now - 5),
+            'early': SubscriberState(timestamp=0, next_poll=now - 10),
+            'future': SubscriberState(timestamp=0, next_poll=now + 600),
+        }
+        observed = SCHEDULER_LAG.count
+        due = homework.due_subscribers(subscribers, states)
+        assert [subscriber.sub_id for subscriber in due] == [
+            'early', 'late'
+        ], 'Подписчики должны опрашиваться в порядке сроков.'
+        assert SCHEDULER_LAG.count == observed + 2, (
+            'Опоздание опроса должно учитываться для каждого подписчика.'
+        )
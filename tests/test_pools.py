@@ -0,0 +1,149 @@
+from contextvars import ContextVar
+import threading
+import time
+
+import requests
+
+import utils
+
+REQUEST_ID: ContextVar = ContextVar('request_id', default=None)
+
+
+class TestBoundedExecutor:
+
+    def get_executor(self, workers, max_pending):
+        from pools import BoundedExecutor
+        return BoundedExecutor(workers, max_pending, 'test')
+
+    def test_submit_blocks_when_queue_is_full(self):
+        executor = self.get_executor(workers=1, max_pending=1)
+        release = threading.Event()
+        executor.submit(release.wait)
+        executor.submit(release.wait)
+        assert len(executor) == 2
+
+        submitted = threading.Event()
+        thread = threading.Thread(
+            target=lambda: (executor.submit(time.sleep, 0), submitted.set())
+        )
+        thread.start()
+        assert not submitted.wait(0.2), (
+            'Постановка задачи в заполненный пул должна блокироваться.'
+        )
+        release.set()
+        assert submitted.wait(5), (
+            'Задача должна ставиться в пул, как только освободится место.'
+        )
+        thread.join()
+        executor.shutdown()
+        assert len(executor) == 0
+
+    def test_task_runs_in_callers_context(self):
+        executor = self.get_executor(workers=2, max_pending=0)
+        REQUEST_ID.set('cycle-1')
+        assert executor.submit(REQUEST_ID.get).result() == 'cycle-1', (
+            'Задача должна видеть контекст потока, поставившего её в пул.'
+        )
+        executor.shutdown()
+
+
+class TestThreadPoolMode:
+    SUBSCRIBERS_QTY = 8
+    API_LATENCY = 0.2
+
+    def test_polls_overlap_and_messages_sent(
+            self, monkeypatch, random_timestamp, homework_module
+    ):
+        import subscribers
+        from pools import BoundedExecutor
+
+        def slow_response_get(*args, **kwargs):
+            time.sleep(self.API_LATENCY)
+            response = utils.MockResponseGET(
+                *args, random_timestamp=random_timestamp, **kwargs
+            )
+            response.json = lambda: {
+                'homeworks': [{'homework_name': 'hw1', 'status': 'approved'}],
+                'current_date': random_timestamp
+            }
+            return response
+
+        class RecordingBot:
+            def __init__(self):
+                self.chats = []
+
+            def send_message(self, chat_id=None, text=None, **kwargs):
+                self.chats.append(chat_id)
+
+        monkeypatch.setattr(requests, 'get', slow_response_get)
+        monkeypatch.setattr(homework_module, 'api_client', None)
+        poll_pool = BoundedExecutor(self.SUBSCRIBERS_QTY, 0, 'poll')
+        send_pool = BoundedExecutor(2, 0, 'send')
+        monkeypatch.setattr(homework_module, 'poll_pool', poll_pool)
+        monkeypatch.setattr(homework_module, 'send_pool', send_pool)
+        bot = RecordingBot()
+        chats = [str(number) for number in range(self.SUBSCRIBERS_QTY)]
+        subscriber_list = [
+            subscribers.Subscriber(chat, 'token', chat) for chat in chats
+        ]
+        states = homework_module.sync_states({}, subscriber_list)
+
+        started = time.monotonic()
+        homework_module.poll_cycle(bot, subscriber_list, states)
+        elapsed = time.monotonic() - started
+        poll_pool.shutdown()
+        send_pool.shutdown()
+
+        assert elapsed < self.API_LATENCY * self.SUBSCRIBERS_QTY / 2, (
+            'В режиме пула потоков запросы к API должны выполняться '
+            'одновременно.'
+        )
+        assert sorted(bot.chats) == chats, (
+            'Сообщения должны отправляться через пул отправки '
+            'каждому подписчику.'
+        )
+
+    def test_budget_exhaustion_skips_queued_polls(
+            self, monkeypatch, random_timestamp, homework_module
+    ):
+        import subscribers
+        from pools import BoundedExecutor
+
+        def slow_response_get(*args, timeout=None, **kwargs):
+            if timeout[1] < self.API_LATENCY:
+                time.sleep(timeout[1])
+                raise requests.ReadTimeout('Read timed out')
+            time.sleep(self.API_LATENCY)
+            return utils.MockResponseGET(
+                *args, random_timestamp=random_timestamp, **kwargs
+            )
+
+        monkeypatch.setattr(requests, 'get', slow_response_get)
+        monkeypatch.setattr(homework_module, 'api_client', None)
+        monkeypatch.setattr(homework_module, 'CYCLE_DEADLINE', 0.5)
+        poll_pool = BoundedExecutor(2, self.SUBSCRIBERS_QTY, 'poll')
+        monkeypatch.setattr(homework_module, 'poll_pool', poll_pool)
+        subscriber_list = [
+            subscribers.Subscriber(str(number), 'token', str(number))
+            for number in range(self.SUBSCRIBERS_QTY)
+        ]
+        states = homework_module.sync_states({}, subscriber_list)
+
+        homework_module.poll_cycle(
+            utils.MockTelegramBot(), subscriber_list, states
+        )
+        poll_pool.shutdown()
+
+        assert all(state.failures == 0 for state in states.values()), (
+            'Исчерпание бюджета цикла не должно считаться сбоем API.'
+        )
+        assert homework_module.api_client.breaker.failures == 0
+        assert homework_module.api_client.breaker.state == 'closed'
+        now = time.monotonic()
+        skipped = [
+            state for state in states.values() if state.next_poll <= now
+        ]
+        assert 0 < len(skipped) < self.SUBSCRIBERS_QTY, (
+            'Опросы, не успевшие до дедлайна, должны остаться в очереди '
+            'до следующего цикла.'
+        )
@@ -0,0 +1,68 @@
+import json
+
+import pytest
+
+
+class TestRecords:
+    HOMEWORK = {
+        'id': 7, 'homework_name': 'hw7', 'status': 'approved',
+        'date_updated': '2020-02-13T14:40:57Z', 'reviewer_comment': 'Ок',
+    }
+
+    def test_parse_homeworks_builds_records(self):
+        from records import HomeworkRecord, parse_homeworks
+
+        records = parse_homeworks([self.HOMEWORK, {'homework_name': 'hw8'}])
+        assert records == [
+            HomeworkRecord('7', 'approved', '2020-02-13T14:40:57Z', 'hw7'),
+            HomeworkRecord('hw8', None, '', 'hw8'),
+        ], 'Работы из ответа API должны переводиться в записи.'
+        assert records[0][:3] == ('7', 'approved', '2020-02-13T14:40:57Z')
+
+    def test_missing_id_keys_do_not_collide(self):
+        from records import parse_homeworks, to_record
+
+        homeworks = [
+            {'id': None, 'homework_name': 'hw1', 'status': 'approved'},
+            {'id': None, 'homework_name': 'hw2', 'status': 'approved'},
+            {'status': 'approved'},
+        ]
+        records = parse_homeworks(homeworks)
+        assert [record.key for record in records] == ['hw1', 'hw2', None], (
+            'Без id ключом записи должно быть имя работы, а без имени — None, '
+            'а не строка \'None\'.'
+        )
+        assert records == [to_record(homework) for homework in homeworks], (
+            'parse_homeworks должна строить записи так же, как to_record.'
+        )
+
+    def test_parse_homeworks_rejects_non_dict(self):
+        from records import parse_homeworks
+
+        with pytest.raises(TypeError):
+            parse_homeworks([self.HOMEWORK, ['hw']])
+
+    def test_parse_status_accepts_record(self, homework_module):
+        from records import to_record
+
+        assert homework_module.parse_status(
+            to_record(self.HOMEWORK)
+        ) == homework_module.parse_status(self.HOMEWORK)
+
+    @pytest.mark.parametrize('backend', ['orjson', None])
+    def test_decode_json(self, monkeypatch, backend):
+        import records
+
+        class Response:
+            content = json.dumps({'homeworks': [self.HOMEWORK]}).encode()
+
+            def json(self):
+                return json.loads(self.content)
+
+        if backend is None:
+            monkeypatch.setattr(records, 'orjson', None)
+        else:
+            pytest.importorskip(backend)
+        assert records.decode_json(Response()) == {
+            'homeworks': [self.HOMEWORK]
+        }, 'Декодеры ответа должны давать одинаковый результат.'
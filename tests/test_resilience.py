@@ -0,0 +1,102 @@
+import asyncio
+import sqlite3
+import time
+
+import pytest
+import telegram
+
+import utils
+
+
+class TestRetryPolicy:
+
+    def test_delay_grows_with_jitter(self):
+        from resilience import RetryPolicy
+
+        policy = RetryPolicy(base=10, max_delay=100)
+        for attempt, ceiling in ((1, 10), (2, 20), (3, 40), (10, 100)):
+            delays = {policy.delay(attempt) for _ in range(20)}
+            assert all(ceiling / 2 <= delay <= ceiling for delay in delays)
+            assert len(delays) > 1, (
+                'Задержка повтора должна содержать случайную составляющую.'
+            )
+
+
+class TestCircuitBreaker:
+
+    def test_open_half_open_closed(self, monkeypatch):
+        from resilience import CircuitBreaker
+
+        now = [1000.0]
+        monkeypatch.setattr(time, 'monotonic', lambda: now[0])
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30)
+        breaker.record_failure()
+        assert breaker.allow()
+        breaker.record_failure()
+        assert breaker.state == breaker.OPEN
+        assert not breaker.allow()
+
+        now[0] += 30
+        assert breaker.allow(), 'После паузы должен пройти пробный запрос.'
+        assert breaker.state == breaker.HALF_OPEN
+        assert not breaker.allow()
+        breaker.record_failure()
+        assert breaker.state == breaker.OPEN
+
+        now[0] += 30
+        assert breaker.allow()
+        breaker.record_success()
+        assert breaker.state == breaker.CLOSED
+        assert breaker.allow()
+
+
+class TestMainLoop:
+
+    def lock_registry(self, monkeypatch, homework_module) -> list:
+        calls = []
+
+        def locked_registry(registry):
+            calls.append(registry)
+            raise sqlite3.OperationalError('database is locked')
+
+        monkeypatch.setattr(homework_module, 'check_tokens', lambda: True)
+        monkeypatch.setattr(
+            homework_module, 'start_services', lambda bot: (None, None)
+        )
+        monkeypatch.setattr(
+            homework_module, 'load_subscribers', locked_registry
+        )
+        return calls
+
+    def test_cycle_error_does_not_stop_bot(self, monkeypatch,
+                                           homework_module):
+        calls = self.lock_registry(monkeypatch, homework_module)
+
+        def sleep(delay):
+            if len(calls) > 1:
+                raise utils.BreakInfiniteLoop('break')
+
+        monkeypatch.setattr(time, 'sleep', sleep)
+        monkeypatch.setattr(telegram, 'Bot', utils.MockTelegramBot)
+        with pytest.raises(utils.BreakInfiniteLoop):
+            homework_module.main()
+        assert len(calls) == 2, (
+            'Сбой вне опроса подписчиков не должен останавливать бота.'
+        )
+
+    def test_async_cycle_error_does_not_stop_bot(self, monkeypatch,
+                                                 homework_module):
+        calls = self.lock_registry(monkeypatch, homework_module)
+
+        async def sleep(delay):
+            if len(calls) > 1:
+                raise utils.BreakInfiniteLoop('break')
+
+        monkeypatch.setattr(asyncio, 'sleep', sleep)
+        with pytest.raises(utils.BreakInfiniteLoop):
+            asyncio.run(homework_module.async_main(
+                utils.MockTelegramBot(), None, None
+            ))
+        assert len(calls) == 2, (
+            'Сбой вне опроса подписчиков не должен останавливать бота.'
+        )
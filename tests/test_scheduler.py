@@ -0,0 +1,99 @@
+class TestAdaptiveInterval:
+    BASE = 600
+    MIN_INTERVAL = 60
+    MAX_INTERVAL = 3600
+
+    def get_interval(self):
+        from scheduler import AdaptiveInterval
+        return AdaptiveInterval(
+            self.BASE, self.MIN_INTERVAL, self.MAX_INTERVAL
+        )
+
+    def test_reviewing_polls_fast(self):
+        interval = self.get_interval()
+        assert interval.next_interval(
+            self.BASE, 'reviewing', changed=True
+        ) == self.MIN_INTERVAL, (
+            'После взятия работы на проверку опрос должен ускоряться.'
+        )
+        assert interval.next_interval(
+            self.MIN_INTERVAL, 'reviewing', changed=False
+        ) == self.MIN_INTERVAL * 2
+        assert interval.next_interval(
+            self.BASE, 'reviewing', changed=False
+        ) == self.BASE, (
+            'Пока работа на проверке, интервал не должен превышать базовый.'
+        )
+
+    def test_idle_backoff_is_bounded(self):
+        interval = self.get_interval()
+        value = interval.next_interval(None, None, changed=False)
+        assert value == self.BASE
+        for _ in range(10):
+            value = interval.next_interval(value, 'approved', changed=False)
+        assert value == self.MAX_INTERVAL, (
+            'Без изменений интервал должен расти до максимального.'
+        )
+        assert interval.next_interval(
+            value, 'approved', changed=True
+        ) == self.BASE
+
+
+class TestPollScheduler:
+
+    class State:
+
+        def __init__(self, next_poll=0.0):
+            self.next_poll = next_poll
+
+    def get_scheduler(self, spread_window=0):
+        from scheduler import PollScheduler
+        return PollScheduler(spread_window)
+
+    def test_pop_due_in_deadline_order(self):
+        scheduler = self.get_scheduler()
+        states = {
+            'late': self.State(30), 'early': self.State(10),
+            'future': self.State(100),
+        }
+        scheduler.sync(states, now=50)
+        assert scheduler.pop_due(50) == [('early', 10), ('late', 30)], (
+            'Подписчики должны извлекаться в порядке сроков опроса.'
+        )
+        assert scheduler.next_due() == 100
+        assert scheduler.pop_due(50) == []
+
+    def test_rescheduled_entries_are_skipped(self):
+        scheduler = self.get_scheduler()
+        states = {'student': self.State(10)}
+        scheduler.sync(states, now=0)
+        states['student'].next_poll = 200
+        scheduler.sync(states, now=0)
+        assert scheduler.next_due() == 200, (
+            'Устаревший срок опроса не должен учитываться.'
+        )
+        assert scheduler.pop_due(150) == []
+        assert scheduler.pop_due(200) == [('student', 200)]
+        assert len(scheduler) == 0
+
+    def test_removed_subscribers_are_dropped(self):
+        scheduler = self.get_scheduler()
+        states = {'first': self.State(10), 'second': self.State(20)}
+        scheduler.sync(states, now=0)
+        del states['first']
+        scheduler.sync(states, now=0)
+        assert scheduler.pop_due(100) == [('second', 20)], (
+            'Удалённые подписчики не должны опрашиваться.'
+        )
+
+    def test_fresh_subscribers_are_spread(self):
+        scheduler = self.get_scheduler(spread_window=60)
+        states = {f'student-{index}': self.State() for index in range(4)}
+        scheduler.sync(states, now=1000)
+        assert sorted(state.next_poll for state in states.values()) == [
+            1000, 1015, 1030, 1045
+        ], 'Первые опросы должны распределяться по окну.'
+        assert [key for key, _ in scheduler.pop_due(1000)] == ['student-0']
+
+    def test_empty_scheduler_has_no_deadline(self):
+        assert self.get_scheduler().next_due() is None
@@ -0,0 +1,103 @@
+import json
+
+import telegram
+
+
+class TestSendQueue:
+
+    def get_bot(self, api):
+        return telegram.Bot(token='1234:abcdefg', base_url=api.base_url)
+
+    def test_delivers_all_chats_in_order(self):
+        from fake_telegram import FakeTelegramAPI
+        from sender import SendQueue
+
+        with FakeTelegramAPI(global_rate=100, chat_rate=20) as api:
+            queue = SendQueue(
+                self.get_bot(api), global_rate=100, chat_rate=20, workers=4
+            ).start()
+            for number in range(3):
+                for chat_id in range(10):
+                    queue.put(chat_id, f'{chat_id}-{number}')
+            assert queue.join(timeout=10), 'Очередь должна опустеть.'
+            queue.stop()
+        assert api.rejected == 0, (
+            'Очередь не должна превышать лимиты Telegram.'
+        )
+        assert queue.sent == 30
+        for chat_id in range(10):
+            texts = [
+                message['text'] for message in api.messages
+                if message['chat']['id'] == chat_id
+            ]
+            assert texts == [f'{chat_id}-{number}' for number in range(3)], (
+                'Сообщения в один чат должны уходить по порядку.'
+            )
+
+    def test_retry_after_is_honored(self):
+        from fake_telegram import FakeTelegramAPI
+        from sender import SendQueue
+
+        with FakeTelegramAPI(chat_rate=1) as api:
+            queue = SendQueue(self.get_bot(api), chat_rate=100).start()
+            queue.put(1, 'первое')
+            queue.put(1, 'второе')
+            assert queue.join(timeout=5)
+            queue.stop()
+        assert api.rejected >= 1
+        assert [message['text'] for message in api.messages] == [
+            'первое', 'второе'
+        ], 'После RetryAfter сообщение должно быть отправлено повторно.'
+
+    def test_permanent_error_goes_to_dead_letters(self, tmp_path):
+        from fake_telegram import FakeTelegramAPI
+        from sender import DeadLetterStore, SendQueue
+
+        path = tmp_path / 'dead_letters.jsonl'
+        with FakeTelegramAPI() as api:
+            queue = SendQueue(
+                self.get_bot(api), dead_letters=DeadLetterStore(str(path))
+            ).start()
+            queue.put(1, '')
+            assert queue.join(timeout=5)
+            queue.stop()
+        records = [json.loads(line) for line in path.read_text().splitlines()]
+        assert len(records) == 1 and records[0]['chat_id'] == '1', (
+            'Недоставленное сообщение должно сохраняться.'
+        )
+        assert queue.failed == 1
+
+
+class TestDigest:
+
+    def test_build_digest_respects_limit(self):
+        from sender import build_digest
+
+        texts = ['a' * 40, 'b' * 40, 'c' * 40, 'd' * 150]
+        digests = build_digest(texts, limit=100)
+        assert digests[0] == 'a' * 40 + '\n\n' + 'b' * 40
+        assert all(len(digest) <= 100 for digest in digests), (
+            'Сводка не должна превышать лимит длины сообщения.'
+        )
+        assert ''.join(digests).replace('\n', '').count('d') == 150
+
+    def test_queue_coalesces_burst_for_chat(self):
+        from fake_telegram import FakeTelegramAPI
+        from sender import SendQueue
+
+        with FakeTelegramAPI() as api:
+            bot = telegram.Bot(token='1234:abcdefg', base_url=api.base_url)
+            queue = SendQueue(bot, coalesce_window=0.3).start()
+            for number in range(5):
+                queue.put(1, f'статус {number}')
+            queue.put(2, 'другой чат')
+            assert queue.join(timeout=5)
+            queue.stop()
+        chat_texts = [
+            message['text'] for message in api.messages
+            if message['chat']['id'] == 1
+        ]
+        assert chat_texts == [
+            '\n\n'.join(f'статус {number}' for number in range(5))
+        ], 'Сообщения в один чат за окно должны уходить одной сводкой.'
+        assert len(api.messages) == 2
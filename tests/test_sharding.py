@@ -0,0 +1,136 @@
+class TestHashRing:
+    KEYS = [f'student-{number}' for number in range(10000)]
+
+    def test_balanced_and_stable(self):
+        from sharding import HashRing
+
+        ring = HashRing(4)
+        counts = [0] * 4
+        for key in self.KEYS:
+            counts[ring.shard(key)] += 1
+        assert all(1500 < count < 3500 for count in counts), counts
+        assert [HashRing(4).shard(key) for key in self.KEYS[:100]] == [
+            ring.shard(key) for key in self.KEYS[:100]
+        ], 'Распределение не должно зависеть от процесса.'
+
+    def test_adding_shard_moves_few_keys(self):
+        from sharding import HashRing
+
+        before, after = HashRing(4), HashRing(5)
+        moved = [
+            key for key in self.KEYS if before.shard(key) != after.shard(key)
+        ]
+        assert len(moved) < len(self.KEYS) * 0.3, (
+            'При добавлении шарда должна переезжать лишь малая часть ключей.'
+        )
+        assert {after.shard(key) for key in moved} == {4}, (
+            'Ключи должны переезжать только в новый шард.'
+        )
+
+
+def load_shards(monkeypatch, homework_module, registry, shards):
+    """Загружает подписчиков по очереди для шардов 0..shards - 1."""
+    owned = []
+    for index in range(shards):
+        monkeypatch.setattr(homework_module, 'SHARD_INDEX', index)
+        owned.append(homework_module.load_subscribers(registry))
+    return owned
+
+
+class TestSharding:
+
+    def test_shards_partition_subscribers(self, monkeypatch, tmp_path,
+                                          homework_module):
+        from subscribers import SubscriberRegistry
+
+        registry = SubscriberRegistry(str(tmp_path / 'subscribers.db'))
+        for number in range(50):
+            registry.add(str(number), 'token', str(number))
+        registry.set_shard_count(3)
+        load_shards(monkeypatch, homework_module, registry, 3)
+        owned = [
+            subscriber.sub_id for subscriber in sum(
+                load_shards(monkeypatch, homework_module, registry, 3), []
+            )
+        ]
+        registry.close()
+        assert sorted(owned) == sorted(str(number) for number in range(50)), (
+            'Каждый подписчик должен относиться ровно к одному шарду.'
+        )
+
+    def test_rebalance_keeps_sent_statuses(self, monkeypatch, tmp_path,
+                                           random_timestamp,
+                                           homework_module):
+        from checkpoint import CheckpointStore
+        from subscribers import SubscriberRegistry
+
+        registry = SubscriberRegistry(str(tmp_path / 'subscribers.db'))
+        for number in range(20):
+            registry.add(str(number), 'token', str(number))
+        checkpoints = CheckpointStore(str(tmp_path / 'checkpoint.db'))
+        response = {
+            'homeworks': [
+                {'id': 1, 'homework_name': 'hw', 'status': 'approved'}
+            ],
+            'current_date': random_timestamp,
+        }
+        monkeypatch.setattr(homework_module, 'SHARD_INDEX', 0)
+        monkeypatch.setattr(homework_module, 'SHARD_COUNT', 1)
+        subscribers = homework_module.load_subscribers(registry)
+        states = homework_module.sync_states({}, subscribers)
+        for state in states.values():
+            assert homework_module.process_response(state, response)
+        homework_module.save_checkpoint(checkpoints, states)
+
+        registry.set_shard_count(2)
+        moved = load_shards(monkeypatch, homework_module, registry, 2)[1]
+        assert 0 < len(moved) < 20
+        new_states = {}
+        homework_module.adopt_states(checkpoints, new_states, moved)
+        new_states = homework_module.sync_states(new_states, moved)
+        for state in new_states.values():
+            assert homework_module.process_response(state, response) == [], (
+                'Подписчик, перешедший в другой шард, не должен получать '
+                'уже отправленные статусы повторно.'
+            )
+        checkpoints.close()
+        registry.close()
+
+    def test_rebalance_waits_for_every_shard(self, monkeypatch, tmp_path,
+                                             homework_module):
+        from subscribers import SubscriberRegistry
+
+        registry = SubscriberRegistry(str(tmp_path / 'subscribers.db'))
+        for number in range(200):
+            registry.add(str(number), 'token', str(number))
+        registry.set_shard_count(2, force=True)
+        before = [
+            [subscriber.sub_id for subscriber in owned]
+            for owned in load_shards(monkeypatch, homework_module, registry, 2)
+        ]
+
+        registry.set_shard_count(3)
+        monkeypatch.setattr(homework_module, 'SHARD_INDEX', 0)
+        during = [[
+            subscriber.sub_id
+            for subscriber in homework_module.load_subscribers(registry)
+        ]]
+        owners = {}
+        for index, owned in enumerate(during + before[1:]):
+            for sub_id in owned:
+                assert owners.setdefault(sub_id, index) == index, (
+                    f'Подписчик {sub_id} не должен опрашиваться двумя '
+                    'шардами во время перераспределения.'
+                )
+        assert set(during[0]) < set(before[0]), (
+            'Пока не все шарды подтвердили перераспределение, подписчики, '
+            'уходящие в новый шард, не должны опрашиваться.'
+        )
+        assert registry.shard_plan().pending == 3
+
+        after = load_shards(monkeypatch, homework_module, registry, 3)
+        assert registry.shard_plan() == (3, None, 2)
+        assert sorted(
+            subscriber.sub_id for subscriber in sum(after, [])
+        ) == sorted(map(str, range(200)))
+        registry.close()
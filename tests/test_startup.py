@@ -0,0 +1,86 @@
+import os
+import subprocess
+import sys
+from types import ModuleType
+
+from conftest import BASE_DIR
+
+HEAVY_MODULES = ('telegram.bot', 'requests.sessions', 'asyncio.base_events',
+                 'http.server')
+
+
+class TestStartup:
+
+    def test_import_has_no_side_effects(self):
+        script = (
+            'import sys, homework; '
+            f'print([name for name in {HEAVY_MODULES!r} '
+            'if name in sys.modules])'
+        )
+        result = subprocess.run(
+            [sys.executable, '-c', script], cwd=BASE_DIR,
+            capture_output=True, text=True, timeout=60, check=True
+        )
+        assert result.stdout.strip() == '[]', (
+            'Тяжёлые зависимости не должны загружаться при импорте: '
+            f'{result.stdout.strip()}'
+        )
+        assert 'Старт Бота' not in result.stderr, (
+            'Импорт модуля не должен писать в лог.'
+        )
+
+    def test_import_starts_no_threads(self):
+        script = (
+            'import threading, homework; '
+            'print(threading.active_count())'
+        )
+        result = subprocess.run(
+            [sys.executable, '-c', script], cwd=BASE_DIR,
+            env={**os.environ, 'LOG_QUEUE': '1'},
+            capture_output=True, text=True, timeout=60, check=True
+        )
+        assert result.stdout.strip() == '1', (
+            'Импорт модуля не должен запускать потоки.'
+        )
+
+    def test_lazy_module_loads_on_access(self, monkeypatch):
+        from lazy import lazy_import
+
+        monkeypatch.delitem(sys.modules, 'colorsys', raising=False)
+        module = lazy_import('colorsys')
+        assert type(module) is not ModuleType, (
+            'Модуль не должен выполняться до первого обращения.'
+        )
+        assert module.rgb_to_hsv(1, 0, 0) == (0, 1, 1)
+        assert type(module) is ModuleType
+
+    def test_services_load_lazy_modules_before_threads(self):
+        script = (
+            'import sys, types, homework; '
+            'homework.start_services(None); '
+            'print(all(type(sys.modules[name]) is types.ModuleType '
+            'for name in ("requests", "telegram", "concurrent.futures")))'
+        )
+        result = subprocess.run(
+            [sys.executable, '-c', script], cwd=BASE_DIR,
+            capture_output=True, text=True, timeout=60, check=True
+        )
+        assert result.stdout.strip() == 'True', (
+            'Отложенные модули должны загружаться до запуска пулов потоков.'
+        )
+
+    def test_async_mode_starts_in_fresh_process(self):
+        script = (
+            'import homework, asyncio, concurrent.futures; '
+            'asyncio.run(homework.async_poll_cycle('
+            'asyncio.Semaphore(1), None, [], {})); '
+            'print(concurrent.futures.Future.__name__)'
+        )
+        result = subprocess.run(
+            [sys.executable, '-c', script], cwd=BASE_DIR,
+            capture_output=True, text=True, timeout=60
+        )
+        assert result.stdout.strip() == 'Future', (
+            'После импорта homework отложенные подмодули должны быть '
+            f'доступны как атрибуты пакета: {result.stderr[-500:]}'
+        )
@@ -0,0 +1,185 @@
+from http import HTTPStatus
+import time
+
+import pytest
+import requests
+
+import utils
+
+
+@pytest.fixture
+def subscribers_module():
+    import subscribers
+    return subscribers
+
+
+class TestSubscribers:
+
+    def test_registry_add_and_remove(self, tmp_path, subscribers_module):
+        registry = subscribers_module.SubscriberRegistry(
+            str(tmp_path / 'subscribers.db')
+        )
+        registry.add('student-1', 'token-1', '111')
+        registry.add('student-2', 'token-2', '222')
+        registry.add('student-1', 'token-3', '333')
+        assert len(registry) == 2, (
+            'Повторное добавление подписчика должно обновлять запись.'
+        )
+        assert registry.all()[0] == subscribers_module.Subscriber(
+            'student-1', 'token-3', '333'
+        )
+        registry.remove('student-2')
+        assert [sub.sub_id for sub in registry] == ['student-1']
+        registry.close()
+
+    def test_poll_subscriber_uses_own_token_and_chat(
+            self, monkeypatch, random_timestamp, homework_module,
+            subscribers_module
+    ):
+        requested_headers = []
+
+        def mock_response_get(*args, **kwargs):
+            requested_headers.append(kwargs['headers'])
+            response = utils.MockResponseGET(
+                *args, random_timestamp=random_timestamp, **kwargs
+            )
+            response.json = lambda: {
+                'homeworks': [{'homework_name': 'hw1', 'status': 'approved'}],
+                'current_date': random_timestamp
+            }
+            return response
+
+        monkeypatch.setattr(requests, 'get', mock_response_get)
+        bot = utils.MockTelegramBot()
+        subscriber = subscribers_module.Subscriber('student', 'secret', '42')
+        state = subscribers_module.SubscriberState(timestamp=0)
+
+        homework_module.poll_subscriber(bot, subscriber, state)
+
+        assert requested_headers == [{'Authorization': 'OAuth secret'}], (
+            'Запрос к API должен выполняться с токеном подписчика.'
+        )
+        assert bot.chat_id == '42', (
+            'Сообщение должно отправляться в чат подписчика.'
+        )
+        assert state.timestamp == random_timestamp
+
+    def test_poll_subscriber_backs_off_on_api_error(
+            self, monkeypatch, homework_module, subscribers_module
+    ):
+        def mock_response_get(*args, **kwargs):
+            return utils.MockResponseGET(
+                http_status=HTTPStatus.INTERNAL_SERVER_ERROR
+            )
+
+        monkeypatch.setattr(requests, 'get', mock_response_get)
+        monkeypatch.setattr(homework_module, 'api_client', None)
+        bot = utils.MockTelegramBot()
+        subscriber = subscribers_module.Subscriber('student', 'secret', '42')
+        state = subscribers_module.SubscriberState(timestamp=0)
+
+        homework_module.poll_subscriber(bot, subscriber, state)
+        homework_module.poll_subscriber(bot, subscriber, state)
+
+        assert state.failures == 2, (
+            'Сбой API не должен останавливать бота.'
+        )
+        assert state.next_poll > time.monotonic(), (
+            'После сбоя API опрос подписчика должен откладываться.'
+        )
+        assert homework_module.due_subscribers(
+            [subscriber], {subscriber.sub_id: state}
+        ) == []
+
+    def test_default_poll_interval_is_fixed(self, monkeypatch,
+                                            homework_module,
+                                            subscribers_module):
+        monkeypatch.setattr(homework_module, 'ADAPTIVE_POLLING', False)
+        state = subscribers_module.SubscriberState(timestamp=0)
+        intervals = []
+        for _ in range(5):
+            homework_module.schedule_next_poll(state, state.status)
+            intervals.append(state.interval)
+        assert intervals == [homework_module.RETRY_PERIOD] * 5, (
+            'Без ADAPTIVE_POLLING интервал опроса не должен расти.'
+        )
+        assert state.next_poll <= (
+            time.monotonic() + homework_module.RETRY_PERIOD
+        )
+
+    def test_default_mode_wakes_at_nearest_due_time(self, monkeypatch,
+                                                    homework_module,
+                                                    subscribers_module):
+        from scheduler import PollScheduler
+
+        monkeypatch.setattr(homework_module, 'ADAPTIVE_POLLING', False)
+        monkeypatch.setattr(homework_module, 'lease', None)
+        monkeypatch.setattr(
+            homework_module, 'poll_scheduler', PollScheduler(600)
+        )
+        subscriber_list = [
+            subscribers_module.Subscriber(str(number), None, str(number))
+            for number in range(10)
+        ]
+        states = homework_module.sync_states({}, subscriber_list)
+        due = homework_module.due_subscribers(subscriber_list, states)
+        assert [subscriber.sub_id for subscriber in due] == ['0']
+        homework_module.schedule_next_poll(states['0'], None)
+        assert homework_module.next_delay(states) == 60, (
+            'Без ADAPTIVE_POLLING бот должен просыпаться к ближайшему сроку '
+            'опроса, а не через RETRY_PERIOD.'
+        )
+
+        states['1'].next_poll = time.monotonic() + 30
+        assert homework_module.next_delay(states) == 30, (
+            'Повтор после сбоя API не должен ждать следующего цикла.'
+        )
+
+    def test_unknown_status_does_not_drop_other_homeworks(
+            self, random_timestamp, homework_module, subscribers_module
+    ):
+        state = subscribers_module.SubscriberState(timestamp=0)
+        response = {
+            'homeworks': [
+                {'id': 2, 'homework_name': 'hw2', 'status': 'approved'},
+                {'id': 1, 'homework_name': 'hw1', 'status': 'weird'},
+            ],
+            'current_date': random_timestamp
+        }
+        messages = homework_module.process_response(state, response)
+        assert len(messages) == 2 and '"hw2"' in messages[1], (
+            'Работа с неизвестным статусом не должна мешать отправке '
+            'остальных.'
+        )
+        assert 'weird' in messages[0]
+        assert state.timestamp == random_timestamp
+        assert homework_module.process_response(state, response) == [], (
+            'Сообщение о том же сбое не должно повторяться.'
+        )
+
+    def test_process_response_notifies_every_changed_homework(
+            self, random_timestamp, homework_module, subscribers_module
+    ):
+        state = subscribers_module.SubscriberState(timestamp=0)
+        response = {
+            'homeworks': [
+                {'id': 3, 'homework_name': 'hw3', 'status': 'reviewing'},
+                {'id': 2, 'homework_name': 'hw2', 'status': 'rejected'},
+                {'id': 1, 'homework_name': 'hw1', 'status': 'approved'},
+            ],
+            'current_date': random_timestamp
+        }
+        messages = homework_module.process_response(state, response)
+        assert len(messages) == 3, (
+            'Бот должен сообщать об изменении статуса каждой работы из ответа.'
+        )
+        assert '"hw1"' in messages[0] and '"hw3"' in messages[-1]
+        assert state.status == 'reviewing'
+
+        assert homework_module.process_response(state, response) == [], (
+            'Бот не должен повторно сообщать о неизменившихся статусах.'
+        )
+
+        response['homeworks'][0]['status'] = 'approved'
+        messages = homework_module.process_response(state, response)
+        assert len(messages) == 1 and '"hw3"' in messages[0]
@@ -0,0 +1,140 @@
+import functools
+from http import HTTPStatus
+
+import pytest
+
+import utils
+from event_emitter import emit
+
+
+class TestEventReceiver:
+
+    def test_respond(self):
+        from webhook import EventReceiver
+
+        events = []
+
+        def handle_event(sub_id, homework):
+            events.append((sub_id, homework))
+            return sub_id != 'unknown'
+
+        receiver = EventReceiver(handle_event, secret='secret')
+        headers = {'X-Webhook-Secret': 'secret'}
+        body = b'{"homework_name": "hw", "status": "approved"}'
+        assert receiver.respond('/events', {}, body)[0] == (
+            HTTPStatus.FORBIDDEN
+        ), 'Событие без секрета должно отклоняться.'
+        assert receiver.respond('/other', headers, body)[0] == (
+            HTTPStatus.NOT_FOUND
+        )
+        assert receiver.respond('/events', headers, b'[1]')[0] == (
+            HTTPStatus.BAD_REQUEST
+        )
+        assert receiver.respond('/events/unknown', headers, body)[0] == (
+            HTTPStatus.NOT_FOUND
+        )
+        status, payload = receiver.respond('/events/42', headers, body)
+        assert status == HTTPStatus.ACCEPTED
+        assert payload == {'accepted': 1}
+        assert events[-1] == ('42', {'homework_name': 'hw',
+                                     'status': 'approved'})
+        receiver.respond('/events', headers, body)
+        assert events[-1][0] == 'env', (
+            'Событие без sub_id относится к подписчику из окружения.'
+        )
+
+
+class TestPushIngestion:
+
+    def test_event_is_sent_once(self, monkeypatch, homework_module):
+        from subscribers import Subscriber
+        from webhook import EventReceiver
+
+        monkeypatch.setattr(homework_module, 'WEBHOOK_PORT', 1)
+        monkeypatch.setattr(homework_module, 'push_targets', {})
+        monkeypatch.setattr(homework_module, 'send_queue', None)
+        subscribers = [Subscriber('42', 'token', '100')]
+        states = homework_module.sync_states({}, subscribers)
+        homework_module.update_push_targets(subscribers, states)
+        bot = utils.MockTelegramBot()
+        receiver = EventReceiver(
+            functools.partial(homework_module.handle_push_event, bot)
+        )
+        receiver.start(0, host='127.0.0.1')
+        homework = {
+            'id': 7, 'homework_name': 'hw7.zip', 'status': 'approved',
+            'date_updated': '2024-01-01T00:00:00Z',
+        }
+        try:
+            assert emit(f'{receiver.url}/42', [homework])[0] == (
+                HTTPStatus.ACCEPTED
+            )
+            assert bot.chat_id == '100'
+            assert 'hw7.zip' in bot.text
+            bot.text = None
+            emit(f'{receiver.url}/42', [homework])
+            assert emit(f'{receiver.url}/7', [homework])[0] == (
+                HTTPStatus.NOT_FOUND
+            )
+        finally:
+            receiver.stop()
+        assert bot.text is None, (
+            'Повторное событие о том же статусе не должно отправляться.'
+        )
+        assert states['42'].status == 'approved'
+        assert states['42'].dirty
+
+    @pytest.mark.parametrize('homework', [
+        {'id': 7, 'homework_name': 'hw7.zip', 'status': 'weird'},
+        {'id': 7, 'status': 'approved'},
+    ])
+    def test_invalid_event_rejected(self, monkeypatch, homework_module,
+                                    homework):
+        from subscribers import Subscriber
+        from webhook import EventReceiver
+
+        monkeypatch.setattr(homework_module, 'WEBHOOK_PORT', 1)
+        monkeypatch.setattr(homework_module, 'push_targets', {})
+        monkeypatch.setattr(homework_module, 'send_queue', None)
+        subscribers = [Subscriber('42', 'token', '100')]
+        states = homework_module.sync_states({}, subscribers)
+        homework_module.update_push_targets(subscribers, states)
+        bot = utils.MockTelegramBot()
+        receiver = EventReceiver(
+            functools.partial(homework_module.handle_push_event, bot),
+            validate_event=homework_module.validate_event
+        )
+        receiver.start(0)
+        valid = {'id': 8, 'homework_name': 'hw8.zip', 'status': 'approved'}
+        try:
+            status, _ = emit(f'{receiver.url}/42', [valid, homework])
+        finally:
+            receiver.stop()
+        assert status == HTTPStatus.BAD_REQUEST, (
+            'Событие без имени работы или с неизвестным статусом '
+            'должно отклоняться.'
+        )
+        assert not hasattr(bot, 'text'), (
+            'Из отклонённого запроса не должно отправляться ни одно событие.'
+        )
+
+    def test_handler_error_returns_server_error(self):
+        from webhook import EventReceiver
+
+        def handle_event(sub_id, homework):
+            raise RuntimeError('сбой')
+
+        receiver = EventReceiver(handle_event)
+        receiver.start(0)
+        try:
+            status, _ = emit(receiver.url, [{'homework_name': 'hw'}])
+        finally:
+            receiver.stop()
+        assert status == HTTPStatus.INTERNAL_SERVER_ERROR
+
+    def test_public_receiver_requires_secret(self, monkeypatch,
+                                             homework_module):
+        monkeypatch.setattr(homework_module, 'WEBHOOK_HOST', '0.0.0.0')
+        monkeypatch.setattr(homework_module, 'WEBHOOK_SECRET', None)
+        with pytest.raises(SystemExit):
+            homework_module.start_push_receiver(utils.MockTelegramBot())
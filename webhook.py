@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import hmac
+from http import HTTPStatus
+import json
+import logging
+import threading
+from typing import Callable, Optional, TYPE_CHECKING
+
+from subscribers import ENV_SUBSCRIBER
+
+if TYPE_CHECKING:
+    from http.server import ThreadingHTTPServer
+
+logger = logging.getLogger(__name__)
+
+EVENTS_PATH = '/events'
+SECRET_HEADER = 'X-Webhook-Secret'
+
+
+def parse_events(body: bytes) -> list:
+    """Возвращает работы из тела события.
+
+    Тело — одна работа в формате элемента homeworks или объект
+    со списком homeworks. При неверном формате вызывает ValueError.
+    """
+    payload = json.loads(body)
+    if isinstance(payload, dict) and 'homeworks' in payload:
+        payload = payload['homeworks']
+    events = payload if isinstance(payload, list) else [payload]
+    if not all(isinstance(event, dict) for event in events):
+        raise ValueError('Событие должно быть объектом работы')
+    return events
+
+
+class EventReceiver:
+    """HTTP-приёмник событий об изменении статуса работ.
+
+    Событие отправляется POST-запросом на /events (подписчик из
+    переменных окружения) или /events/<sub_id>. Каждая работа из тела
+    передаётся в handle_event(sub_id, homework), который возвращает
+    False для неизвестного подписчика. Если задан secret, запрос должен
+    содержать его в заголовке X-Webhook-Secret. Если задан
+    validate_event, он проверяет все работы до обработки первой и
+    вызывает ValueError для неверной, тогда запрос отклоняется целиком.
+    """
+
+    def __init__(self, handle_event: Callable[[str, dict], bool],
+                 secret: Optional[str] = None,
+                 validate_event: Optional[Callable[[dict], None]] = None
+                 ) -> None:
+        self.handle_event = handle_event
+        self.secret = secret
+        self.validate_event = validate_event
+        self.received = 0
+        self._server = None
+
+    def respond(self, path: str, headers, body: bytes) -> tuple:
+        """Возвращает код и тело ответа на событие."""
+        if self.secret is not None and not hmac.compare_digest(
+            headers.get(SECRET_HEADER, ''), self.secret
+        ):
+            return HTTPStatus.FORBIDDEN, {'error': 'wrong secret'}
+        prefix, found, sub_id = path.rstrip('/').partition(EVENTS_PATH)
+        if prefix or not found or sub_id and not sub_id.startswith('/'):
+            return HTTPStatus.NOT_FOUND, {'error': 'not found'}
+        sub_id = sub_id.lstrip('/') or ENV_SUBSCRIBER.sub_id
+        try:
+            events = parse_events(body)
+            if self.validate_event is not None:
+                for event in events:
+                    self.validate_event(event)
+        except ValueError as error:
+            return HTTPStatus.BAD_REQUEST, {'error': str(error)}
+        for event in events:
+            if not self.handle_event(sub_id, event):
+                return HTTPStatus.NOT_FOUND, {'error': 'unknown subscriber'}
+            self.received += 1
+        return HTTPStatus.ACCEPTED, {'accepted': len(events)}
+
+    def start(self, port: int,
+              host: str = '127.0.0.1') -> ThreadingHTTPServer:
+        """Запускает приёмник в фоновом потоке.
+
+        По умолчанию приёмник доступен только с этой же машины.
+        """
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        receiver = self
+
+        class Handler(BaseHTTPRequestHandler):
+            """Принимает события по HTTP."""
+
+            def do_POST(self) -> None:
+                """Обрабатывает событие."""
+                length = int(self.headers.get('Content-Length', 0))
+                body = self.rfile.read(length) if length else b''
+                try:
+                    status, payload = receiver.respond(
+                        self.path, self.headers, body
+                    )
+                except Exception as error:
+                    logger.exception('Сбой при обработке события: %s', error)
+                    status = HTTPStatus.INTERNAL_SERVER_ERROR
+                    payload = {'error': 'internal error'}
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format: str, *args) -> None:
+                """Не пишет в лог каждый запрос."""
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(
+            target=self._server.serve_forever, daemon=True
+        ).start()
+        return self._server
+
+    @property
+    def url(self) -> str:
+        """Адрес приёма событий запущенного приёмника."""
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}{EVENTS_PATH}'
+
+    def stop(self) -> None:
+        """Останавливает приёмник."""
+        self._server.shutdown()
+        self._server.server_close()